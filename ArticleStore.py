@@ -0,0 +1,426 @@
+import sqlite3
+import re
+import sys
+import threading
+from datetime import datetime
+
+# Article storage: one SQLite table keyed by guid. The old entries.xml / archive.xml
+# split is kept as an `archived` flag so moving items to the archive is an UPDATE,
+# not a rewrite of every article we have ever downloaded.
+#
+# published / downloaded keep the text the feed gave us (and the day we fetched it);
+# published_ts / downloaded_ts are the same moments as epoch seconds, worked out once at
+# ingest, so time windows are index range scans. An article with no usable publication date
+# gets its download time.
+
+FIELDS = ("guid", "link", "title", "description", "published", "downloaded", "source_name",
+          "published_ts", "downloaded_ts")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    guid        TEXT PRIMARY KEY,
+    link        TEXT NOT NULL DEFAULT '',
+    title       TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    published   TEXT NOT NULL DEFAULT '',
+    downloaded  TEXT NOT NULL DEFAULT '',
+    source_name TEXT NOT NULL DEFAULT 'Unknown',
+    archived    INTEGER NOT NULL DEFAULT 0,
+    published_ts  INTEGER NOT NULL DEFAULT 0,
+    downloaded_ts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_articles_downloaded ON articles(downloaded);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source_name);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Created after the timestamp columns are added to an older database
+TIME_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_articles_downloaded_ts ON articles(archived, downloaded_ts);
+CREATE INDEX IF NOT EXISTS idx_articles_published_ts ON articles(archived, published_ts);
+"""
+TIME_ORDER = {"downloaded": "downloaded_ts", "published": "published_ts"}
+
+# Full-text index over title + description, kept in sync by triggers so every
+# insert/edit is indexed as it lands. Archiving only flips a flag and doesn't reindex.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, description, content='articles', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE OF title, description ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+    INSERT INTO articles_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description);
+END;
+"""
+
+# Download days seen so far: "YYYY-MM-DD" -> (the one shared copy of that string, local midnight as epoch seconds)
+_days = {}
+
+def day_start(text):
+    # Local midnight at the start of a "YYYY-MM-DD" day in epoch seconds (0 if it isn't one),
+    # parsed once per distinct day
+    return _day(text)[1]
+
+def _day(text):
+    found = _days.get(text)
+    if found is None:
+        try: start = int(datetime.strptime(text[:10], "%Y-%m-%d").timestamp())
+        except (TypeError, ValueError): start = 0
+        found = _days[text] = (sys.intern(text) if isinstance(text, str) else "", start)
+    return found
+
+def parse_time(text):
+    # Epoch seconds for an RSS (RFC 822) or Atom (ISO 8601) date, None if it can't be read.
+    # Dates without a zone are taken as local time.
+    if not text: return None
+    import email.utils # Only legacy rows and odd feeds get here; keep it off the startup path
+    try:
+        parts = email.utils.parsedate_tz(text)
+        if parts: return int(email.utils.mktime_tz(parts))
+    except (TypeError, ValueError, OverflowError):
+        pass
+    try:
+        return int(datetime.fromisoformat(text.strip().replace("Z", "+00:00")).timestamp())
+    except (ValueError, OverflowError, OSError):
+        return None
+
+class Article:
+    # One article in memory. Slots instead of a dict per article, one shared copy of each
+    # source name and download day, and both timestamps as ints so date filters compare
+    # numbers. Reads like the dicts it replaced: item['title'], item.get('link', ''),
+    # dict(item). Treat it as read-only; it may be shared by caches.
+    # Timestamps left out are worked out from the text fields (legacy XML, old rows).
+    __slots__ = FIELDS
+
+    def __init__(self, guid, link="", title="", description="", published="", downloaded="", source_name="Unknown",
+                 published_ts=None, downloaded_ts=None):
+        self.guid = guid
+        self.link = guid if link == guid else link # Feeds often use the link as the guid
+        self.title = title
+        self.description = description
+        self.published = published
+        self.downloaded, day = _day(downloaded)
+        self.source_name = sys.intern(source_name)
+        self.downloaded_ts = day if downloaded_ts is None else downloaded_ts
+        if published_ts is None: published_ts = parse_time(published)
+        self.published_ts = self.downloaded_ts if published_ts is None else published_ts
+
+    @classmethod
+    def from_dict(cls, d):
+        if isinstance(d, cls): return d
+        return cls(d["guid"], d.get("link", ""), d.get("title", ""), d.get("description", ""),
+                   d.get("published", ""), d.get("downloaded", ""), d.get("source_name", "Unknown"),
+                   d.get("published_ts"), d.get("downloaded_ts"))
+
+    def __getitem__(self, key):
+        if key not in FIELDS: raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in FIELDS else default
+
+    def __contains__(self, key):
+        return key in FIELDS
+
+    def keys(self):
+        return FIELDS
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __repr__(self):
+        return f"Article({self.guid!r}, {self.title[:40]!r}, {self.source_name!r}, {self.downloaded!r})"
+
+_QUERY_TOKEN = re.compile(r'"[^"]*"|\(|\)|[^\s()"]+')
+
+def fts_query(text):
+    # Turn what people type into a safe FTS5 expression:
+    #   "exact phrase", AND / OR / NOT, ( ), prefix*, -exclude, -"phrase", -(group).  Bare words are ANDed.
+    # FTS5's NOT needs something on its left, so an exclusion at the start of the query (or of
+    # a group, or just after OR) waits for the next term and is attached after it:
+    # "-foo bar" -> "bar" NOT "foo". A query of nothing but exclusions gives "".
+    out = []
+    pending = []    # Exclusions waiting for a term to follow
+    held = []       # Per open "(": (outer pending, index of "(", whether the group is excluded)
+    negate = False  # A NOT with nothing on its left applies to the next term or group
+    OPS = ("AND", "OR", "NOT", "(")
+
+    def has_word(text):
+        # Terms of bare punctuation ("-", "&") tokenize to nothing and would match nothing
+        return any(c.isalnum() for c in text)
+
+    def add_term(term):
+        if out and out[-1] not in OPS: out.append("AND")
+        out.append(term)
+
+    def exclude(term):
+        # NOT <term> after what came before, or held back until a term arrives
+        nonlocal negate
+        negate = False
+        if out and out[-1] == "AND": out.pop()
+        if out and out[-1] not in OPS: out.extend(["NOT", term])
+        else: pending.append(term)
+
+    def attach():
+        for term in pending: out.extend(["NOT", term])
+        pending.clear()
+
+    tokens = _QUERY_TOKEN.findall(text)
+    for i, tok in enumerate(tokens):
+        if tok == "-" and i + 1 < len(tokens) and (tokens[i + 1] == "(" or tokens[i + 1].startswith('"')):
+            tok = "NOT" # -(group) and -"phrase"
+        if tok in ("AND", "OR"):
+            if out and out[-1] not in OPS: out.append(tok)
+        elif tok == "NOT":
+            if out and out[-1] not in OPS: out.append("NOT")
+            elif not out or out[-1] != "NOT": negate = True
+        elif tok == "(":
+            if out and out[-1] == "NOT": # NOT ( ... ): the group is the right-hand side
+                out.pop(); negate = True
+            add_term("(")
+            held.append((pending[:], len(out) - 1, negate))
+            pending.clear(); negate = False
+        elif tok == ")":
+            if not held: continue
+            outer, start, negated = held.pop()
+            while out and out[-1] in OPS:
+                if out.pop() == "(": break
+            else:
+                if out: out.append(")")
+            inner = pending[:]
+            pending[:] = outer + inner # Exclusions left over inside the group carry on outside it
+            if len(out) > start and out[-1] == ")":
+                if negated:
+                    group = " ".join(out[start:])
+                    del out[start:]
+                    exclude(group)
+                else:
+                    attach()
+        elif tok.startswith('"'):
+            if has_word(tok):
+                if negate: exclude(tok)
+                else: add_term(tok); attach()
+        elif tok.startswith("-") and len(tok) > 1:
+            word = tok[1:].strip('"')
+            if has_word(word): exclude('"%s"' % word.replace('"', '""'))
+        else:
+            prefix = tok.endswith("*") and len(tok) > 1
+            word = tok.rstrip("*")
+            if has_word(word):
+                term = '"%s"%s' % (word.replace('"', '""'), "*" if prefix else "")
+                if negate: exclude(term)
+                else: add_term(term); attach()
+    while out and out[-1] in OPS:
+        out.pop()
+    if out: attach() # Trailing exclusions ("bar OR -foo") go on the end
+    # Balance parentheses rather than hand FTS5 a syntax error
+    depth = 0; balanced = []
+    for tok in out:
+        if tok == "(": depth += 1
+        elif tok == ")":
+            if depth == 0: continue
+            depth -= 1
+        balanced.append(tok)
+    balanced.extend(")" * depth)
+    return " ".join(balanced)
+
+class ArticleStore:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local() # sqlite connections can't be shared across threads
+        conn = self._conn()
+        with conn:
+            conn.executescript(SCHEMA)
+        self._add_timestamps()
+        self.has_fts = self._init_fts()
+
+    def _add_timestamps(self):
+        # Databases from before published_ts / downloaded_ts get the columns, filled in from the text fields
+        conn = self._conn()
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(articles)")]
+        if "downloaded_ts" not in columns:
+            with conn:
+                conn.execute("ALTER TABLE articles ADD COLUMN published_ts INTEGER NOT NULL DEFAULT 0")
+                conn.execute("ALTER TABLE articles ADD COLUMN downloaded_ts INTEGER NOT NULL DEFAULT 0")
+                rows = conn.execute("SELECT rowid, published, downloaded FROM articles").fetchall()
+                updates = []
+                for rowid, published, downloaded in rows:
+                    downloaded_ts = day_start(downloaded)
+                    published_ts = parse_time(published)
+                    updates.append((downloaded_ts if published_ts is None else published_ts, downloaded_ts, rowid))
+                conn.executemany("UPDATE articles SET published_ts = ?, downloaded_ts = ? WHERE rowid = ?", updates)
+            if rows: print(f"Added timestamps to {len(rows)} stored articles")
+        with conn:
+            conn.executescript(TIME_INDEXES)
+
+    def _init_fts(self):
+        conn = self._conn()
+        try:
+            with conn:
+                conn.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            return False # SQLite built without FTS5; search falls back to LIKE scans
+        if self.get_meta("fts_built") != "1":
+            # Index articles that were stored before the FTS table existed
+            with conn:
+                conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+            self.set_meta("fts_built", "1")
+        return True
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # --- meta key/value (last fetch time, migration flags) ---
+
+    def get_meta(self, key, default=None):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    # --- articles ---
+
+    def load(self, archived=False):
+        rows = self._conn().execute(
+            f"SELECT {', '.join(FIELDS)} FROM articles WHERE archived = ?", (int(archived),))
+        return {row[0]: Article(*row) for row in rows}
+
+    def iter(self, archived=None, since=None, by="downloaded", batch=500, until=None):
+        # Stream rows newest first by download or publication time (`by`), from before `until`
+        # back to `since` (epoch seconds). With `archived` given, the (archived, *_ts) index makes
+        # this one range scan: O(log n) to find the window, then only the k rows inside it are read.
+        column = TIME_ORDER[by]
+        sql = f"SELECT {', '.join(FIELDS)} FROM articles"
+        conds = []; params = []
+        if archived is not None: conds.append("archived = ?"); params.append(int(archived))
+        if since is not None: conds.append(f"{column} >= ?"); params.append(int(since))
+        if until is not None: conds.append(f"{column} < ?"); params.append(int(until))
+        if conds: sql += " WHERE " + " AND ".join(conds)
+        cur = self._conn().execute(sql + f" ORDER BY {column} DESC, rowid DESC", params)
+        while True:
+            rows = cur.fetchmany(batch)
+            if not rows: break
+            for row in rows: yield Article(*row)
+
+    def count(self, archived=None):
+        if archived is None:
+            return self._conn().execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        return self._conn().execute("SELECT COUNT(*) FROM articles WHERE archived = ?", (int(archived),)).fetchone()[0]
+
+    def count_by_source(self, archived=None, since=None, by="downloaded"):
+        # {source_name: articles}, optionally only within a time window (same index as iter)
+        column = TIME_ORDER[by]
+        conds = []; params = []
+        if archived is not None: conds.append("archived = ?"); params.append(int(archived))
+        if since is not None: conds.append(f"{column} >= ?"); params.append(int(since))
+        where = " WHERE " + " AND ".join(conds) if conds else ""
+        return dict(self._conn().execute(f"SELECT source_name, COUNT(*) FROM articles{where} GROUP BY source_name", params))
+
+    def _rows(self, entries, archived):
+        for e in entries:
+            if not e.get("guid"): continue
+            a = Article.from_dict(e) # Fills in timestamps for plain dicts
+            yield (a.guid, a.link, a.title, a.description, a.published, a.downloaded, a.source_name,
+                   a.published_ts, a.downloaded_ts, int(archived))
+
+    def existing(self, guids, chunk=500):
+        # The subset of `guids` already stored (live or archived)
+        guids = list(guids); found = set()
+        conn = self._conn()
+        for i in range(0, len(guids), chunk):
+            part = guids[i:i + chunk]
+            rows = conn.execute(f"SELECT guid FROM articles WHERE guid IN ({', '.join('?' * len(part))})", part)
+            found.update(row[0] for row in rows)
+        return found
+
+    def add(self, entries, archived=False):
+        # Insert articles we haven't seen before (live or archived). Returns how many were new.
+        with self._conn() as conn:
+            cur = conn.executemany(
+                f"INSERT OR IGNORE INTO articles ({', '.join(FIELDS)}, archived) "
+                f"VALUES ({', '.join('?' * (len(FIELDS) + 1))})", self._rows(entries, archived))
+            return max(cur.rowcount, 0)
+
+    def upsert(self, entries, archived=False):
+        # ON CONFLICT DO UPDATE (not INSERT OR REPLACE) so the FTS update trigger fires
+        with self._conn() as conn:
+            conn.executemany(
+                f"INSERT INTO articles ({', '.join(FIELDS)}, archived) "
+                f"VALUES ({', '.join('?' * (len(FIELDS) + 1))}) ON CONFLICT(guid) DO UPDATE SET "
+                "link = excluded.link, title = excluded.title, description = excluded.description, "
+                "published = excluded.published, downloaded = excluded.downloaded, "
+                "source_name = excluded.source_name, published_ts = excluded.published_ts, "
+                "downloaded_ts = excluded.downloaded_ts, archived = excluded.archived", self._rows(entries, archived))
+
+    def delete(self, guids, chunk=500):
+        # Remove articles for good (the FTS delete trigger unindexes them). Returns how many went.
+        guids = list(guids); removed = 0
+        with self._conn() as conn:
+            for i in range(0, len(guids), chunk):
+                part = guids[i:i + chunk]
+                removed += conn.execute(f"DELETE FROM articles WHERE guid IN ({', '.join('?' * len(part))})", part).rowcount
+        return removed
+
+    def vacuum(self):
+        # Give the space of deleted rows back to the file system (rewrites the whole database).
+        # FTS5 keeps deletions as tombstones until its segments are merged, so merge them first.
+        conn = self._conn()
+        if self.has_fts:
+            with conn: conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('optimize')")
+        conn.execute("VACUUM")
+        # In WAL mode the rebuilt pages land in the -wal file; copy them back so newsdesk.db shrinks
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def archive_downloaded_before(self, date_str):
+        # Move every live article downloaded on or before date_str (YYYY-MM-DD) to the archive
+        with self._conn() as conn:
+            cur = conn.execute("UPDATE articles SET archived = 1 WHERE archived = 0 AND downloaded <= ?", (date_str,))
+            return cur.rowcount
+
+    def search(self, text, archived=None, limit=None):
+        # Ranked full-text search. archived=None searches live and archive together.
+        cols = ", ".join("a." + f for f in FIELDS)
+        where = "" if archived is None else " AND a.archived = %d" % int(archived)
+        tail = "" if limit is None else " LIMIT %d" % int(limit)
+        conn = self._conn()
+        if self.has_fts:
+            query = fts_query(text)
+            if not query:
+                if text.strip(): print(f"Search {text!r} has nothing to look for (exclusions need a word to apply to)")
+                return []
+            # Title hits weigh more than description hits
+            sql = (f"SELECT {cols} FROM articles_fts f JOIN articles a ON a.rowid = f.rowid "
+                   f"WHERE articles_fts MATCH ?{where} ORDER BY bm25(articles_fts, 5.0, 1.0){tail}")
+            return [Article(*row) for row in conn.execute(sql, (query,))]
+        like = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        sql = (f"SELECT {cols} FROM articles a WHERE (a.title LIKE ? ESCAPE '\\' OR a.description LIKE ? ESCAPE '\\')"
+               f"{where} ORDER BY a.downloaded_ts DESC{tail}")
+        return [Article(*row) for row in conn.execute(sql, (like, like))]
@@ -0,0 +1,485 @@
+import os
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import statistics
+import subprocess
+import tracemalloc
+import contextlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Benchmarks for the hot paths, on synthetic data in a throwaway folder (your feeds.json and
+# newsdesk.db are never touched). Every corpus and feed is generated from a fixed seed, so
+# runs on the same machine are comparable.
+#
+#   python Benchmark.py                              # 1k and 10k article corpora, 50 feeds
+#   python Benchmark.py --sizes 1k,10k,100k,500k --output after.json
+#   python Benchmark.py --compare before.json        # exit 1 if a best run got >25% slower
+#
+# Corpus benchmarks (per size): writing and reading legacy entries.xml, migrating it into
+# SQLite, save_entries, load_entries (cold and cached), filter_entries (by day or hour window,
+# by publication time, with the archive, and full-text search), run_ai_analysis with an in-process mock model (prompt
+# assembly, batching and map-reduce without network time) and filling the GUI article list
+# (skipped when there is no display). Memory (per size): what load_entries of the archive and
+# a 30-day filter_entries keep allocated, and their peak, measured with tracemalloc. Cold
+# archive (per size): moving the archive into monthly segments, sizes on disk, and reading a
+# 30-day window back through them.
+# Topic benchmarks: building the topic index for 5,000 feeds, resolving topic expressions
+# and summing per-topic counts.
+# Fetch benchmarks: process_feeds_logic against a local server of RSS and Atom feeds, first
+# fetch, an all-304 refetch, and a refetch after every feed changed.
+# Enrichment benchmarks: extracting one article page, and full-text enrichment of 200 articles
+# from the local server, downloaded and then from the page cache.
+#
+# Results go to stdout (or --output) as JSON; a readable table goes to stderr.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+SEED = 1965
+TOPICS = ["Tech", "World", "Business", "Science", "Politics", "Climate", "Health", "Sports"]
+SOURCES = 50
+DAYS_SPREAD = 30        # Corpus articles are spread over this many days; older than 7 are archived
+REGRESSION = 1.25       # --compare flags a best run slower than this ratio...
+NOISE_FLOOR = 0.005     # ...unless both took less than this many seconds
+
+# ==============================================================================
+# SYNTHETIC DATA
+# ==============================================================================
+
+class Corpus:
+    # Deterministic articles with a Zipf-like vocabulary, so search terms hit realistic numbers of rows
+    def __init__(self, seed=SEED, vocab_size=8000):
+        self.rng = random.Random(seed)
+        letters = "abcdefghijklmnopqrstuvwxyz"
+        self.vocab = ["".join(self.rng.choice(letters) for _ in range(self.rng.randint(3, 10))) for _ in range(vocab_size)]
+        weights = [1.0 / (rank + 1) for rank in range(vocab_size)]
+        self.cum_weights = []
+        total = 0.0
+        for w in weights:
+            total += w; self.cum_weights.append(total)
+
+    def words(self, n):
+        return " ".join(self.rng.choices(self.vocab, cum_weights=self.cum_weights, k=n))
+
+    def article(self, guid, downloaded, source):
+        return {"guid": guid, "link": f"https://example.com/{guid}", "title": self.words(self.rng.randint(6, 12)).title(),
+                "description": self.words(self.rng.randint(30, 70)), "published": downloaded,
+                "downloaded": downloaded, "source_name": source}
+
+    def articles(self, size):
+        # Returns (live, archived) dicts keyed by guid, split at 7 days like the app does
+        today = datetime.now().date()
+        live = {}; archived = {}
+        for i in range(size):
+            day = self.rng.randrange(DAYS_SPREAD)
+            entry = self.article(f"bench-{i}", (today - timedelta(days=day)).isoformat(), source_name(i % SOURCES))
+            (live if day < 7 else archived)[entry["guid"]] = entry
+        return live, archived
+
+def source_name(i):
+    return f"Source {i:02d}"
+
+def feed_config(base_url=None, feeds=SOURCES):
+    return [{"name": source_name(i), "url": f"{base_url or 'http://127.0.0.1:9'}/feed/{i}.{'atom' if i % 2 else 'rss'}",
+             "topics": [TOPICS[i % len(TOPICS)], TOPICS[(i * 3 + 1) % len(TOPICS)]]} for i in range(feeds)]
+
+class FeedHandler(BaseHTTPRequestHandler):
+    # /feed/<n>.rss or .atom; content depends on (n, server.version) and honours If-None-Match.
+    # server.delays {n: seconds} slows single feeds down; with server.etags False no ETag is sent.
+    # /page/<n>.html is an article page for the enrichment benchmark.
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        if self.path.startswith("/page/"):
+            if server.latency: time.sleep(server.latency)
+            body = article_page(int(self.path.rsplit("/", 1)[-1].split(".")[0])).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        name = self.path.rsplit("/", 1)[-1]
+        n, kind = name.split(".")
+        etag = f'"{n}-{server.version}"' if server.etags else None
+        delay = server.delays.get(int(n), server.latency)
+        if delay: time.sleep(delay)
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304); self.send_header("ETag", etag); self.send_header("Content-Length", "0"); self.end_headers()
+            return
+        body = server.feed_body(int(n), kind).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/atom+xml" if kind == "atom" else "application/rss+xml")
+        self.send_header("Content-Length", str(len(body)))
+        if etag: self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def article_page(n, paragraphs=12):
+    # A news page with the usual clutter around the story: scripts, navigation, related links, footer
+    rng = random.Random(SEED + n)
+    words = ["market", "officials", "said", "report", "growth", "policy", "court", "energy", "vote", "data",
+             "city", "company", "percent", "year", "after", "plan", "new", "week", "government", "people"]
+    sentence = lambda k: " ".join(rng.choice(words) for _ in range(k)).capitalize() + "."
+    story = "".join(f"<p>{sentence(18)} {sentence(14)} {sentence(20)}</p>\n" for _ in range(paragraphs))
+    links = "".join(f'<li><a href="/page/{n + i}.html">{sentence(6)}</a></li>' for i in range(1, 15))
+    return (f"<!DOCTYPE html><html><head><title>Story {n}</title><script>{'var a=1;' * 400}</script>"
+            f"<style>{'p{margin:0}' * 200}</style></head><body><header><nav><ul>{links}</ul></nav></header>"
+            f'<main><article><h1>{sentence(8)}</h1><div class="byline">By Staff</div><div class="body">{story}</div>'
+            f"</article><aside><h2>Related</h2><ul>{links}</ul></aside></main>"
+            f"<footer><p>{sentence(30)}</p></footer></body></html>")
+
+def start_feed_server(items=50, latency=0.0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    server.daemon_threads = True
+    server.version = 0
+    server.latency = latency
+    server.delays = {}
+    server.etags = True
+    corpus = Corpus(SEED + 1)
+    texts = [(corpus.words(8).title(), corpus.words(50)) for _ in range(items * 2)]
+    stamp = datetime.now().strftime("%a, %d %b %Y %H:%M:%S +0000")
+    iso = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def feed_body(n, kind):
+        # Each new version replaces half the items, as a busy feed would between checks
+        entries = []
+        for k in range(items):
+            version = server.version if k < items // 2 else 0
+            title, text = texts[(n * 7 + k + version * items // 2) % len(texts)]
+            guid = f"feed{n}-v{version}-{k}"
+            if kind == "atom":
+                entries.append(f"<entry><id>{guid}</id><title>{title}</title><link href=\"https://example.com/{guid}\"/>"
+                               f"<updated>{iso}</updated><summary>{text}</summary></entry>")
+            else:
+                entries.append(f"<item><guid>{guid}</guid><title>{title}</title><link>https://example.com/{guid}</link>"
+                               f"<pubDate>{stamp}</pubDate><description>{text}</description></item>")
+        if kind == "atom":
+            return (f'<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+                    f"<title>Feed {n}</title><id>urn:feed:{n}</id><updated>{iso}</updated>{''.join(entries)}</feed>")
+        return (f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>Feed {n}</title>'
+                f"<link>https://example.com/</link><description>Feed {n}</description>{''.join(entries)}</channel></rss>")
+
+    server.feed_body = feed_body
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+# ==============================================================================
+# HARNESS
+# ==============================================================================
+
+results = []
+
+def record(bench, size, samples, **extra):
+    row = {"bench": bench, "size": size, "median": round(statistics.median(samples), 6),
+           "min": round(min(samples), 6), "runs": len(samples)}
+    row.update(extra)
+    results.append(row)
+    size_str = "" if size is None else f"{size:>8,}"
+    print(f"  {bench:<34} {size_str:>8}  {row['median'] * 1000:10.1f} ms  (min {row['min'] * 1000:.1f})"
+          + "".join(f"  {k}={v}" for k, v in extra.items()), file=sys.stderr)
+    return row
+
+def record_memory(bench, size, fn):
+    # Runs fn once under tracemalloc; reports what its result keeps allocated and the peak
+    value = None
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            value = fn()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    rows = len(value)
+    row = {"bench": bench, "size": size, "retained_mb": round(retained / 2**20, 1), "peak_mb": round(peak / 2**20, 1),
+           "bytes_per_row": retained // max(1, rows), "rows": rows}
+    results.append(row)
+    print(f"  {bench:<34} {size:>8,}  {row['retained_mb']:8.1f} MB  (peak {row['peak_mb']:.1f}, "
+          f"{row['bytes_per_row']} bytes/row)  rows={rows}", file=sys.stderr)
+    return row
+
+def timed(fn, repeat, setup=None):
+    # Returns (samples, last result). Output from the code under test is swallowed.
+    samples = []; value = None
+    for _ in range(repeat):
+        if setup is not None: setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            value = fn()
+            samples.append(time.perf_counter() - start)
+    return samples, value
+
+@contextlib.contextmanager
+def workspace():
+    # A fresh folder holding feeds.json / newsdesk.db etc., and a fresh store singleton
+    old = os.getcwd()
+    path = tempfile.mkdtemp(prefix="newsdesk-bench-")
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        reset_store()
+        os.chdir(old)
+        shutil.rmtree(path, ignore_errors=True)
+
+def reset_store(remove=False):
+    import GetNews
+    if GetNews._store is not None: GetNews._store.close()
+    GetNews._store = None
+    GetNews.invalidate_entries_cache()
+    if remove:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(GetNews.DB_FILE + suffix): os.remove(GetNews.DB_FILE + suffix)
+
+class BenchBackend:
+    # Stands in for LLMBackends: answers instantly with MockLLMServer's replies
+    name = "bench"
+    label = "bench/mock"
+
+    def __init__(self):
+        self.calls = 0; self.prompt_chars = 0
+
+    def generate(self, prompt, on_text=None, cancel=None):
+        import MockLLMServer
+        self.calls += 1; self.prompt_chars += len(prompt)
+        text = MockLLMServer.mock_reply(prompt)
+        if on_text is not None: on_text(text)
+        return text
+
+def bench_corpus(size, repeat, corpus):
+    import GetNews, NewsDesk
+    print(f"\nCorpus of {size:,} articles", file=sys.stderr)
+    live, archived = corpus.articles(size)
+    with workspace():
+        with open("feeds.json", "w") as f: json.dump(feed_config(), f)
+
+        samples, _ = timed(lambda: (GetNews.save_xml_entries(GetNews.ENTRIES_FILE, live),
+                                    GetNews.save_xml_entries(GetNews.ARCHIVE_FILE, archived)), repeat)
+        record("save_xml_entries", size, samples)
+        samples, _ = timed(lambda: GetNews.load_xml_entries(GetNews.ENTRIES_FILE), repeat)
+        record("load_xml_entries", size, samples, rows=len(live))
+
+        def unmigrate():
+            reset_store(remove=True)
+            for path in (GetNews.ENTRIES_FILE, GetNews.ARCHIVE_FILE):
+                if os.path.exists(path + ".migrated"): os.replace(path + ".migrated", path)
+        samples, _ = timed(GetNews.get_store, repeat, setup=unmigrate)
+        record("migrate_xml_to_store", size, samples)
+
+        samples, _ = timed(lambda: GetNews.save_entries(GetNews.ENTRIES_FILE, live), repeat)
+        record("save_entries", size, samples, rows=len(live))
+        samples, _ = timed(lambda: GetNews.load_entries(GetNews.ENTRIES_FILE), repeat, setup=GetNews.invalidate_entries_cache)
+        record("load_entries", size, samples, rows=len(live))
+        samples, _ = timed(lambda: GetNews.load_entries(GetNews.ENTRIES_FILE), repeat)
+        record("load_entries_cached", size, samples)
+
+        term = corpus.vocab[40] # Common, but far from every article
+        for label, args in (("filter_entries[days=1,topic]", (1, TOPICS[0], "", False)),
+                            ("filter_entries[days=7]", (7, "All", "", False)),
+                            ("filter_entries[hours=36]", (1, "All", "", False, 36)),
+                            ("filter_entries[days=7,topic expr]", (7, f"{TOPICS[0]} OR {TOPICS[1]} -{TOPICS[2]}", "", False)),
+                            ("filter_entries[days=7,published]", (7, "All", "", False, None, "published")),
+                            ("filter_entries[days=30,archive]", (30, "All", "", True)),
+                            ("filter_entries[search,archive]", (30, "All", term, True))):
+            samples, rows = timed(lambda: NewsDesk.filter_entries(*args), repeat)
+            record(label, size, samples, rows=len(rows))
+
+        samples, counts = timed(lambda: NewsDesk.topic_counts(7), repeat)
+        record("topic_counts[days=7]", size, samples, topics=len(counts))
+
+        selection = NewsDesk.filter_entries(1, "All", "", False)
+        backend = BenchBackend()
+        samples, _ = timed(lambda: NewsDesk.run_ai_analysis(selection, use_cache=False, backend=backend), repeat)
+        record("run_ai_analysis[mock]", size, samples, articles=len(selection), model_calls=backend.calls // repeat)
+
+        GetNews.invalidate_entries_cache()
+        record_memory("memory[load_entries,archive]", size, lambda: GetNews.load_entries(GetNews.ARCHIVE_FILE))
+        GetNews.invalidate_entries_cache()
+        record_memory("memory[filter_entries,days=30]", size, lambda: NewsDesk.filter_entries(30, "All", "", True))
+
+        bench_gui(size, repeat, NewsDesk.filter_entries(30, "All", "", True))
+        bench_cold(size, repeat)
+
+def bench_cold(size, repeat):
+    # Moves the whole archive (everything older than 7 days) into monthly segments, then reads it back
+    import GetNews, NewsDesk, ColdArchive
+    store = GetNews.get_store()
+    store._conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    db_bytes = os.path.getsize(GetNews.DB_FILE)
+    samples, moved = timed(lambda: ColdArchive.compact(store, after_days=7), 1)
+    store.vacuum()
+    segment_bytes = sum(seg["bytes"] for seg in ColdArchive.load_manifest()["segments"].values())
+    record("cold_compact", size, samples, moved=moved, db_mb_before=round(db_bytes / 2**20, 1),
+           db_mb_after=round(os.path.getsize(GetNews.DB_FILE) / 2**20, 1), segments_mb=round(segment_bytes / 2**20, 1))
+    GetNews.invalidate_entries_cache()
+    samples, rows = timed(lambda: NewsDesk.filter_entries(30, "All", "", True), repeat)
+    record("filter_entries[days=30,archive,cold]", size, samples, rows=len(rows))
+
+def bench_topics(feeds, repeat):
+    # Building the topic index for a large feeds.json and resolving expressions against it
+    import TopicIndex
+    rng = random.Random(SEED)
+    topics = [f"Topic{i}" for i in range(max(8, feeds // 20))]
+    config = [{"name": f"Feed {i}", "url": f"http://example.com/{i}", "topics": rng.sample(topics, 3)} for i in range(feeds)]
+    print(f"\nTopic index over {feeds:,} feeds, {len(topics)} topics", file=sys.stderr)
+    samples, index = timed(lambda: TopicIndex.TopicIndex(config), repeat)
+    record("topic_index_build", feeds, samples)
+    exprs = [f"{topics[i]} OR {topics[i + 1]} -{topics[i + 2]}" for i in range(0, 60, 3)]
+    samples, _ = timed(lambda: [TopicIndex.TopicIndex._evaluate(index, TopicIndex._TOKEN.findall(e)) for e in exprs], repeat)
+    record("topic_expression[x20]", feeds, samples)
+    counts = {f["name"]: rng.randrange(100) for f in config}
+    samples, _ = timed(lambda: index.counts(counts), repeat)
+    record("topic_counts_sum", feeds, samples)
+
+def bench_gui(size, repeat, rows):
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        results.append({"bench": "gui_set_rows", "size": size, "skipped": str(e).splitlines()[0]})
+        print(f"  {'gui_set_rows':<34} {size:>8,}  skipped ({str(e).splitlines()[0]})", file=sys.stderr)
+        return
+    import NewsDeskGUI
+    try:
+        root.geometry("1100x800")
+        article_list = NewsDeskGUI.ArticleList(root)
+        article_list.pack(fill=tk.BOTH, expand=True)
+        root.update()
+        def populate():
+            article_list.set_rows(rows)
+            root.update()
+        samples, _ = timed(populate, repeat)
+        record("gui_set_rows", size, samples, rows=len(rows))
+    finally:
+        root.destroy()
+
+def bench_fetch(feeds, items, latency, repeat):
+    import GetNews
+    print(f"\nFetching {feeds} feeds x {items} items (latency {latency * 1000:.0f} ms)", file=sys.stderr)
+    server, url = start_feed_server(items, latency)
+    try:
+        with workspace():
+            with open("feeds.json", "w") as f: json.dump(feed_config(url, feeds), f)
+            def fresh():
+                reset_store(remove=True)
+                if os.path.exists(GetNews.FEED_CACHE_FILE): os.remove(GetNews.FEED_CACHE_FILE)
+                server.version = 0
+            samples, summary = timed(GetNews.process_feeds_logic, repeat, setup=fresh)
+            record("process_feeds_logic[first]", feeds, samples, added=summary["added"])
+            samples, summary = timed(GetNews.process_feeds_logic, repeat)
+            record("process_feeds_logic[304]", feeds, samples, unchanged=summary["unchanged"])
+            def bump(): server.version += 1
+            samples, summary = timed(GetNews.process_feeds_logic, repeat, setup=bump)
+            record("process_feeds_logic[changed]", feeds, samples, added=summary["added"])
+    finally:
+        server.shutdown()
+
+def bench_enrich(pages, latency, repeat):
+    # Full-text enrichment of a briefing selection: downloading and extracting every page, then
+    # the same selection again from page_cache.db. All pages share one host, so the politeness
+    # delay is switched off to measure the pipeline itself.
+    import Enrich, ArticleStore
+    print(f"\nEnriching {pages} articles (latency {latency * 1000:.0f} ms)", file=sys.stderr)
+    page = article_page(0)
+    samples, text = timed(lambda: Enrich.extract_text(page), repeat * 10)
+    record("extract_text", len(page), samples, chars=len(text))
+    server, url = start_feed_server(latency=latency)
+    delay = Enrich.POLITE_DELAY
+    Enrich.POLITE_DELAY = 0
+    try:
+        with workspace():
+            articles = [ArticleStore.Article(f"g{n}", f"{url}/page/{n}.html", f"Story {n}", "Teaser.", "",
+                                             "2025-03-01 08:00:00", source_name(n)) for n in range(pages)]
+            def fresh():
+                if os.path.exists(Enrich.PAGE_CACHE_FILE): os.remove(Enrich.PAGE_CACHE_FILE)
+            samples, out = timed(lambda: Enrich.enrich(articles, per_host=pages), repeat, setup=fresh)
+            record("enrich[download]", pages, samples, enriched=sum(a.description != "Teaser." for a in out))
+            samples, out = timed(lambda: Enrich.enrich(articles), repeat)
+            record("enrich[cached]", pages, samples, cache_mb=round(os.path.getsize(Enrich.PAGE_CACHE_FILE) / 2**20, 2))
+    finally:
+        Enrich.POLITE_DELAY = delay
+        server.shutdown()
+
+# ==============================================================================
+# MAIN
+# ==============================================================================
+
+def parse_size(text):
+    text = text.strip().lower()
+    return int(float(text[:-1]) * 1000) if text.endswith("k") else int(text)
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(current, baseline_path, threshold):
+    # Prints the ratio for every benchmark in both runs; returns how many regressed.
+    # Best runs are compared: they vary far less between runs than medians on a busy machine.
+    with open(baseline_path) as f: baseline = json.load(f)
+    old = {(r["bench"], r["size"]): r for r in baseline["results"] if "min" in r}
+    regressions = 0
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('revision')}):", file=sys.stderr)
+    for r in current:
+        before = old.get((r["bench"], r["size"]))
+        if before is None or "min" not in r: continue
+        ratio = r["min"] / before["min"] if before["min"] else float("inf")
+        slow = ratio > threshold and max(r["min"], before["min"]) >= NOISE_FLOOR
+        regressions += slow
+        size_str = "" if r["size"] is None else f"{r['size']:>8,}"
+        print(f"  {r['bench']:<34} {size_str:>8}  {before['min'] * 1000:9.1f} -> {r['min'] * 1000:9.1f} ms"
+              f"  x{ratio:.2f}{'  REGRESSION' if slow else ''}", file=sys.stderr)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="News Desk benchmarks on synthetic feeds and corpora")
+    parser.add_argument("--sizes", default="1k,10k", help="Corpus sizes, e.g. 1k,10k,100k,500k")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark (median is reported)")
+    parser.add_argument("--feeds", type=int, default=SOURCES, help="Synthetic feeds for the fetch benchmark (0 to skip)")
+    parser.add_argument("--items", type=int, default=50, help="Items per synthetic feed")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the feed server waits before answering")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="Earlier --output file to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION, help="Slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    started = time.time()
+    for size in sizes:
+        bench_corpus(size, args.repeat, Corpus())
+    if args.feeds:
+        bench_fetch(args.feeds, args.items, args.latency, args.repeat)
+    bench_topics(5000, args.repeat)
+    bench_enrich(200, args.latency, args.repeat)
+
+    report = {"meta": {"revision": git_revision(), "date": datetime.now().isoformat(timespec="seconds"),
+                       "python": platform.python_version(), "platform": platform.platform(),
+                       "sizes": sizes, "repeat": args.repeat, "seconds": round(time.time() - started, 1)},
+              "results": results}
+    text = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, "w") as f: f.write(text + "\n")
+        print(f"\nResults saved to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    if args.compare and compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
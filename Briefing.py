@@ -0,0 +1,169 @@
+import re
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+from LLMCache import make_key, article_fingerprint
+
+# Briefing synthesis. Small selections go to the model in one prompt, exactly as before.
+# Selections bigger than the token budget are map-reduced: each article is condensed into a
+# short digest (many articles per request, concurrently, within the rate limit), and the
+# digests are merged into the final briefing, in several rounds if they still don't fit.
+#
+# With an LLMCache, whole briefings and per-article digests are reused across runs. Digests
+# don't depend on the topic/search constraints, so overlapping briefings share them and only
+# newly arrived articles cost a model call.
+#
+# With `previous` (an earlier briefing's text), the final request rewrites that briefing with the
+# new articles folded in, so an incremental run can still produce one complete report.
+#
+# `generate(prompt, on_text=None)` is whatever talks to the model (see LLMBackends.py): it
+# returns the response text and, if on_text is given, streams chunks to it as they arrive.
+
+CHARS_PER_TOKEN = 4         # Rough estimate for English prose; good enough for packing
+TOKEN_BUDGET = 30000        # Max prompt tokens per model request
+MAP_WORKERS = 4             # Batches summarized at once (backends enforce their own rate limits)
+
+PROMPT_HEADER = "You are an executive news analyst. Create a structured briefing from these articles."
+FORMAT_RULES = ("Use Markdown formatting. Use ## for Headlines, ** for bold importance, and * for bullet points. "
+                "Group by theme.\n\n")
+MAP_HEADER = ("You are an executive news analyst. This is one batch of a larger set of articles. "
+              "Write compact notes on the key developments: bullet points grouped by theme, keeping "
+              "names, numbers and which source reported each point. The notes will be merged with "
+              "notes from the other batches, so do not write an introduction or conclusion.")
+REDUCE_HEADER = ("You are an executive news analyst. Below are condensed notes on a large set of "
+                 "articles. Merge them into one structured briefing, combining points that describe "
+                 "the same story and keeping the source attributions.")
+DIGEST_HEADER = ("You are an executive news analyst. For each article below, write a digest of one to "
+                 "three sentences with its key facts: who, what, numbers, and why it matters. Reply with "
+                 "one block per article: a line '### <id>' using the id given, then the digest. "
+                 "Do not skip any article.\n\n")
+PREVIOUS_HEADER = ("\nPREVIOUS BRIEFING: the briefing below was written earlier. Produce one updated briefing "
+                   "that folds the new articles into it: add new developments, update stories that moved on, and "
+                   "keep earlier points that still matter.\n\n")
+# Bump when a prompt above changes so cached output made with the old wording is ignored
+PROMPT_VERSION = 1
+
+_DIGEST_BLOCK = re.compile(r"^###\s*(\S+)\s*$", re.MULTILINE)
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def format_article(item):
+    return f"Title: {item['title']}\nSource: {item.get('source_name')}\nContent: {item['description']}\n\n"
+
+def context_instruction(topic_constraint=None, search_constraint=None):
+    context = ""
+    if topic_constraint and topic_constraint != "All":
+        context += f"\nSTRICT CONSTRAINT: The user is only interested in the topic: '{topic_constraint}'. DISCARD and IGNORE any information that does not directly pertain to this topic."
+
+    if search_constraint:
+        context += f"\nSTRICT CONSTRAINT: The user is only interested in the keyword: '{search_constraint}'. Focus EXCLUSIVELY on insights related to this term. IGNORE unrelated context."
+    return context
+
+def parse_digests(text):
+    parts = _DIGEST_BLOCK.split(text)
+    return {parts[i]: parts[i + 1].strip() for i in range(1, len(parts) - 1, 2)}
+
+def build_prompt(header, context, body):
+    return f"{header}{context}\n{FORMAT_RULES}{body}"
+
+def pack_batches(texts, budget):
+    # Greedy, order-preserving packing of text blocks into batches of at most `budget` tokens.
+    # A single block over budget is cut down rather than dropped.
+    batches = []; current = []; used = 0
+    for text in texts:
+        cost = estimate_tokens(text)
+        if cost > budget:
+            text = text[:budget * CHARS_PER_TOKEN - 16] + "...\n\n"
+            cost = estimate_tokens(text)
+        if current and used + cost > budget:
+            batches.append(current); current = []; used = 0
+        current.append(text); used += cost
+    if current: batches.append(current)
+    return batches
+
+def synthesize(articles, generate, topic_constraint=None, search_constraint=None, token_budget=TOKEN_BUDGET,
+               workers=MAP_WORKERS, limiter=None, on_text=None, cancel=None, log=print, cache=None, model_name="",
+               previous=None):
+    # Returns the briefing body (without the Sources Reviewed list).
+    # `limiter` is only needed when `generate` doesn't throttle itself.
+    context = context_instruction(topic_constraint, search_constraint)
+    prior = f"{PREVIOUS_HEADER}{previous.strip()}\n\n--- New articles ---\n" if previous else ""
+    overhead = estimate_tokens(build_prompt(REDUCE_HEADER, context, prior))
+    budget = max(1000, token_budget - overhead)
+
+    def call(prompt, stream=None, cached=True):
+        if cancel is not None and cancel.is_set(): raise CancelledError()
+        key = make_key("call", model_name, prompt)
+        if cached and cache is not None:
+            hit = cache.get(key)
+            if hit is not None:
+                if stream is not None: stream(hit)
+                return hit
+        if limiter is not None: limiter.acquire(cancel)
+        text = generate(prompt, on_text=stream)
+        if cached and cache is not None: cache.put(key, text, "call")
+        return text
+
+    briefing_key = make_key("briefing", model_name, PROMPT_VERSION, context, [article_fingerprint(a) for a in articles],
+                            *([previous] if previous else []))
+    if cache is not None:
+        hit = cache.get(briefing_key)
+        if hit is not None:
+            log("Briefing served from cache")
+            if on_text is not None: on_text(hit)
+            return hit
+
+    texts = [format_article(item) for item in articles]
+    header = PROMPT_HEADER
+    if len(pack_batches(texts, budget)) > 1:
+        digests = digest_articles(articles, call, budget, workers, cache, model_name, log)
+        texts = [f"Title: {item['title']}\nSource: {item.get('source_name')}\nDigest: {digest}\n\n"
+                 for item, digest in zip(articles, digests)]
+        header = REDUCE_HEADER
+
+    # Merge rounds: condense batches into notes until everything fits in one request
+    round_no = 0
+    while True:
+        batches = pack_batches(texts, budget)
+        if len(batches) > 1 and round_no > 0 and len(batches) >= len(texts):
+            # Notes came back too long to ever share a batch; trim them all into one final request
+            share = budget * CHARS_PER_TOKEN // len(texts)
+            batches = [[text[:share] for text in texts]]
+        if len(batches) == 1:
+            body = call(build_prompt(header, context, prior + "".join(batches[0])), on_text)
+            if cache is not None:
+                cache.put(briefing_key, body, "briefing")
+                cache.evict()
+            return body
+        round_no += 1
+        log(f"Merge round {round_no}: {len(texts)} items in {len(batches)} batches of <= {token_budget} tokens")
+        prompts = [build_prompt(MAP_HEADER, context, "".join(batch)) for batch in batches]
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(prompts)))) as pool:
+            notes = list(pool.map(call, prompts))
+        texts = [f"--- Notes {i + 1} ---\n{note.strip()}\n\n" for i, note in enumerate(notes)]
+        header = REDUCE_HEADER
+
+def digest_articles(articles, call, budget, workers=MAP_WORKERS, cache=None, model_name="", log=print):
+    # One digest per article, in order. Cached digests are reused; the rest are requested
+    # in batches. An article the model skipped falls back to its (truncated) description.
+    keys = [make_key("digest", model_name, PROMPT_VERSION, article_fingerprint(item)) for item in articles]
+    digests = [cache.get(key) if cache is not None else None for key in keys]
+    todo = [i for i, d in enumerate(digests) if d is None]
+    log(f"Digests: {len(articles) - len(todo)} cached, {len(todo)} to generate")
+    if not todo: return digests
+
+    blocks = [f"### a{i}\n{format_article(articles[i])}" for i in todo]
+    prompts = [DIGEST_HEADER + "".join(batch) for batch in pack_batches(blocks, budget)]
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(prompts)))) as pool:
+        # Digests are cached one by one below, not as whole batch replies
+        replies = list(pool.map(lambda prompt: call(prompt, cached=False), prompts))
+
+    found = {}
+    for reply in replies: found.update(parse_digests(reply))
+    for i in todo:
+        digest = found.get(f"a{i}")
+        if digest:
+            digests[i] = digest
+            if cache is not None: cache.put(keys[i], digest, "digest")
+        else:
+            digests[i] = articles[i].get('description', '')[:300]
+    return digests
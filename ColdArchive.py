@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import gzip
+import time
+import argparse
+from datetime import datetime
+
+import ArticleStore
+import GetNews
+
+# Cold tier of the archive. Archived articles older than COLD_AFTER_DAYS leave newsdesk.db for
+# one gzip-compressed JSON-lines file per month of download time (archive/2025-03.jsonl.gz).
+# archive/manifest.json records each segment's article count and the range of download and
+# publication times it covers, so a query opens only the segments its time window touches.
+#
+#   python ColdArchive.py list
+#   python ColdArchive.py compact [--after-days 90] [--vacuum]
+#   python ColdArchive.py prune --keep-months 24
+#   python ColdArchive.py query --from 2025-01 --to 2025-03 [--search "rate cut"] [--topic Business]
+#   python ColdArchive.py export --from 2025-01 --to 2025-03 --output q1.jsonl   (or .xml)
+#
+# query and export cover newsdesk.db and the segments together. Fetches compact at most once
+# a day (COMPACT_EVERY), which only touches the articles being moved. compact and prune hold
+# GetNews.fetch_lock like a fetch does, so they never rewrite a segment at the same time as
+# one another or as a fetch's own compaction.
+
+ARCHIVE_DIR = "archive"
+MANIFEST_FILE = "manifest.json"
+COLD_AFTER_DAYS = 90        # Archived articles older than this move out of newsdesk.db
+RETAIN_MONTHS = 0           # Segments older than this many months are deleted; 0 keeps them all
+COMPACT_EVERY = 24 * 3600   # Seconds between automatic compactions after a fetch
+
+# ==============================================================================
+# SEGMENTS
+# ==============================================================================
+
+def _path(name, folder):
+    return os.path.join(folder, name)
+
+def load_manifest(folder=ARCHIVE_DIR):
+    # {"segments": {"2025-03": {"file", "count", "bytes", "downloaded": [lo, hi], "published": [lo, hi]}}}
+    try:
+        with open(_path(MANIFEST_FILE, folder), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"segments": {}}
+
+def save_manifest(manifest, folder=ARCHIVE_DIR):
+    GetNews.atomic_write(_path(MANIFEST_FILE, folder), json.dumps(manifest, indent=1, sort_keys=True))
+
+def month_of(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m")
+
+def read_segment(name, folder=ARCHIVE_DIR):
+    # Every article in one month's segment, newest download first
+    path = _path(f"{name}.jsonl.gz", folder)
+    if not os.path.exists(path): return []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [ArticleStore.Article.from_dict(json.loads(line)) for line in f if line.strip()]
+
+def write_segment(name, articles, folder=ARCHIVE_DIR):
+    # Rewrites one month's segment (temp file, fsync, rename) and returns its manifest record
+    file_name = f"{name}.jsonl.gz"
+    path = _path(file_name, folder)
+    articles = sorted(articles, key=lambda a: a.downloaded_ts, reverse=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as f:
+                for a in articles:
+                    f.write((json.dumps(dict(a), ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp): os.remove(tmp)
+    return {"file": file_name, "count": len(articles), "bytes": os.path.getsize(path),
+            "downloaded": [min(a.downloaded_ts for a in articles), max(a.downloaded_ts for a in articles)],
+            "published": [min(a.published_ts for a in articles), max(a.published_ts for a in articles)]}
+
+def touched(manifest, since=None, until=None, by="downloaded"):
+    # Names of the segments holding any article with its `by` time in [since, until), newest first
+    names = []
+    for name, seg in manifest["segments"].items():
+        lo, hi = seg[by]
+        if (since is None or hi >= since) and (until is None or lo < until): names.append(name)
+    return sorted(names, reverse=True)
+
+def iter_articles(since=None, by="downloaded", until=None, folder=ARCHIVE_DIR):
+    # Cold articles in [since, until), newest first by `by`, opening only the segments that overlap
+    names = touched(load_manifest(folder), since, until, by)
+    key = (lambda a: a.published_ts) if by == "published" else (lambda a: a.downloaded_ts)
+    def in_window(a):
+        return (since is None or key(a) >= since) and (until is None or key(a) < until)
+    if by == "downloaded":
+        # Segments are months of download time, so newest segment first is already in order
+        for name in names:
+            yield from (a for a in read_segment(name, folder) if in_window(a))
+        return
+    # Publication times can stray across months: sort what the window touches
+    yield from sorted((a for name in names for a in read_segment(name, folder) if in_window(a)), key=key, reverse=True)
+
+def search(text, since=None, by="downloaded", until=None, folder=ARCHIVE_DIR):
+    # Same query syntax and ranking as the store: the touched segments go through an in-memory FTS index
+    articles = list(iter_articles(since, by, until, folder))
+    if not articles: return []
+    scratch = ArticleStore.ArticleStore(":memory:")
+    try:
+        scratch.add(articles, archived=True)
+        return scratch.search(text)
+    finally:
+        scratch.close()
+
+# ==============================================================================
+# COMPACTION AND RETENTION
+# ==============================================================================
+
+def compact(store, after_days=COLD_AFTER_DAYS, folder=ARCHIVE_DIR):
+    # Moves archived articles downloaded more than `after_days` ago into their month's segment.
+    # Segments are written before the rows are deleted, so a crash between the two only means
+    # the next run rewrites the same segments (merged by guid) and deletes the rows then.
+    cutoff = time.time() - after_days * 86400
+    os.makedirs(folder, exist_ok=True)
+    manifest = load_manifest(folder)
+    moved = []
+    month = None; batch = []
+
+    def flush():
+        merged = {a.guid: a for a in read_segment(month, folder)}
+        merged.update((a.guid, a) for a in batch)
+        manifest["segments"][month] = write_segment(month, merged.values(), folder)
+        save_manifest(manifest, folder)
+        moved.extend(a.guid for a in batch)
+
+    # Newest first, so each month's rows arrive together and only one month is held in memory
+    for a in store.iter(archived=True, until=cutoff):
+        m = month_of(a.downloaded_ts)
+        if m != month and batch:
+            flush(); batch = []
+        month = m
+        batch.append(a)
+    if batch: flush()
+    return store.delete(moved)
+
+def prune(keep_months=RETAIN_MONTHS, folder=ARCHIVE_DIR):
+    # Deletes segments for months more than `keep_months` before this one. Returns the months removed.
+    if not keep_months: return []
+    now = datetime.now()
+    index = now.year * 12 + now.month - 1 - keep_months
+    oldest = f"{index // 12:04d}-{index % 12 + 1:02d}"
+    manifest = load_manifest(folder)
+    removed = sorted(name for name in manifest["segments"] if name < oldest)
+    for name in removed:
+        path = _path(manifest["segments"].pop(name)["file"], folder)
+        if os.path.exists(path): os.remove(path)
+    if removed: save_manifest(manifest, folder)
+    return removed
+
+def compact_if_due(store):
+    # Called after each fetch, under its fetch_lock; does nothing until COMPACT_EVERY has passed since the last run
+    last = store.get_meta("cold_compacted")
+    if last and time.time() - float(last) < COMPACT_EVERY: return 0
+    moved = compact(store)
+    removed = prune()
+    store.set_meta("cold_compacted", time.time())
+    if moved or removed:
+        print(f"Cold archive: moved {moved} articles to {ARCHIVE_DIR}/, removed {len(removed)} old segments")
+    return moved
+
+# ==============================================================================
+# COMMAND LINE
+# ==============================================================================
+
+def parse_period(text, end=False):
+    # "2025", "2025-03" or "2025-03-15" -> epoch seconds at its start (or, with end, just after it)
+    parts = [int(p) for p in text.split("-")]
+    year, month, day = (parts + [1, 1])[:3]
+    if end:
+        if len(parts) == 1: year += 1
+        elif len(parts) == 2: year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        else: return datetime(year, month, day).timestamp() + 86400
+    return datetime(year, month, day).timestamp()
+
+def period_articles(since, until, by="downloaded", search_text="", topic=None):
+    # Articles from newsdesk.db and the segments in [since, until), newest first
+    # (searches: store matches by rank, then cold matches)
+    import heapq, TopicIndex
+    store = GetNews.get_store()
+    if search_text:
+        ts = lambda a: getattr(a, ArticleStore.TIME_ORDER[by])
+        hot = [a for a in store.search(search_text) if (since is None or ts(a) >= since) and (until is None or ts(a) < until)]
+        found = hot + search(search_text, since, by, until)
+    else:
+        found = heapq.merge(store.iter(since=since, until=until, by=by), iter_articles(since, by, until),
+                            key=lambda a: getattr(a, ArticleStore.TIME_ORDER[by]), reverse=True)
+    sources = TopicIndex.load(GetNews.FEEDS_FILE).sources(topic)
+    return [a for a in found if sources is None or a.source_name in sources]
+
+def main():
+    parser = argparse.ArgumentParser(description="News Desk cold archive: monthly compressed segments")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Show the segments and what newsdesk.db still holds")
+    p = sub.add_parser("compact", help="Move old archived articles out of newsdesk.db")
+    p.add_argument("--after-days", type=int, default=COLD_AFTER_DAYS)
+    p.add_argument("--vacuum", action="store_true", help="Shrink newsdesk.db afterwards (rewrites the file)")
+    p = sub.add_parser("prune", help="Delete segments older than a number of months")
+    p.add_argument("--keep-months", type=int, required=True)
+    for name in ("query", "export"):
+        p = sub.add_parser(name, help="Print articles from a period" if name == "query" else "Write a period to .jsonl or .xml")
+        p.add_argument("--from", dest="start", help="First day or month, e.g. 2025-01 or 2025-01-15")
+        p.add_argument("--to", dest="end", help="Last day or month (inclusive)")
+        p.add_argument("--search", default="", help="Full-text search, same syntax as NewsDesk.py")
+        p.add_argument("--topic", help="Topic or topic expression")
+        p.add_argument("--sort", choices=sorted(ArticleStore.TIME_ORDER), default="downloaded")
+        if name == "export": p.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        store = GetNews.get_store()
+        print(f"newsdesk.db: {store.count(False)} live, {store.count(True)} archived")
+        manifest = load_manifest()
+        for name, seg in sorted(manifest["segments"].items()):
+            print(f"  {name}  {seg['count']:7d} articles  {seg['bytes'] / 1024:9.0f} KB")
+        total = sum(seg['bytes'] for seg in manifest["segments"].values())
+        print(f"{len(manifest['segments'])} segments, {sum(s['count'] for s in manifest['segments'].values())} articles, "
+              f"{total / 2**20:.1f} MB")
+    elif args.command == "compact":
+        store = GetNews.get_store()
+        with GetNews.fetch_lock():
+            moved = compact(store, args.after_days)
+            store.set_meta("cold_compacted", time.time())
+            print(f"Moved {moved} articles to {ARCHIVE_DIR}/")
+            if args.vacuum:
+                store.vacuum()
+                print(f"newsdesk.db is now {os.path.getsize(GetNews.DB_FILE) / 2**20:.1f} MB")
+    elif args.command == "prune":
+        with GetNews.fetch_lock():
+            removed = prune(args.keep_months)
+        print(f"Removed {len(removed)} segments" + (f": {', '.join(removed)}" if removed else ""))
+    else:
+        since = parse_period(args.start) if args.start else None
+        until = parse_period(args.end, end=True) if args.end else None
+        articles = period_articles(since, until, args.sort, args.search, args.topic)
+        if args.command == "query":
+            for a in articles:
+                print(f"{a.downloaded}  {a.source_name[:24]:<24}  {a.title[:90]}\n{'':36}{a.link}")
+            print(f"{len(articles)} articles")
+        elif args.output.endswith(".xml"):
+            GetNews.save_xml_entries(args.output, {a.guid: a for a in articles})
+            print(f"Wrote {len(articles)} articles to {args.output}")
+        else:
+            with GetNews.atomic_file(args.output) as f:
+                for a in articles: f.write(json.dumps(dict(a), ensure_ascii=False) + "\n")
+            print(f"Wrote {len(articles)} articles to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import re
+import zlib
+
+# Near-duplicate story clustering. Many feeds carry the same wire story with small edits;
+# this groups them so synthesis sees one representative per story plus the list of outlets.
+#
+# Each article becomes a set of word 3-shingles (title + description). A one-permutation
+# MinHash sketch (one hash per shingle, min per bin) is split into LSH bands; articles that
+# share any band are candidates, and only candidates get an exact Jaccard check. That keeps
+# the cost roughly linear in the number of articles instead of comparing every pair.
+
+SIMILARITY = 0.5    # Jaccard similarity of shingle sets at which two articles are the same story
+SHINGLE_WORDS = 3
+BINS = 32           # MinHash sketch size
+BANDS = 16          # BINS / BANDS rows per band; 16 x 2 catches ~99% of pairs at 0.5 similarity
+BUCKET_CHECKS = 8   # Exact comparisons per shared band, at most
+
+_WORD = re.compile(r"\w+")
+_TAG = re.compile(r"<[^>]+>")
+_EMPTY = (1 << 32) - 1
+
+def shingles(item):
+    text = _TAG.sub(" ", f"{item.get('title', '')} {item.get('description', '')}").lower()
+    words = _WORD.findall(text)
+    if len(words) < SHINGLE_WORDS:
+        return set(zlib.crc32(w.encode("utf-8")) for w in words)
+    return set(zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"))
+               for i in range(len(words) - SHINGLE_WORDS + 1))
+
+def sketch(shingle_set):
+    # One-permutation hashing: the bin comes from the hash, keep the smallest value per bin.
+    # Empty bins borrow from the next filled bin so short texts still compare sensibly.
+    bins = [_EMPTY] * BINS
+    for h in shingle_set:
+        b = h % BINS
+        v = h // BINS
+        if v < bins[b]: bins[b] = v
+    if _EMPTY in bins and len(shingle_set) > 0:
+        filled = [i for i, v in enumerate(bins) if v != _EMPTY]
+        for i in range(BINS):
+            if bins[i] == _EMPTY:
+                j = next((f for f in filled if f > i), filled[0])
+                bins[i] = bins[j] + (j - i) % BINS * 0x9E3779B1 # Offset so borrowed values stay distinct
+    return bins
+
+def cluster(articles, similarity=SIMILARITY):
+    # Returns a list of clusters (lists of articles), in order of each cluster's first article.
+    sets = [shingles(item) for item in articles]
+    parent = list(range(len(articles)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    rows = BINS // BANDS
+    buckets = {}
+    for i, s in enumerate(sets):
+        if not s: continue
+        bins = sketch(s)
+        for band in range(BANDS):
+            key = (band, tuple(bins[band * rows:(band + 1) * rows]))
+            bucket = buckets.setdefault(key, [])
+            # Check against a few earlier members; a huge bucket means a boilerplate-heavy band
+            for j in bucket[:BUCKET_CHECKS]:
+                ri, rj = find(i), find(j)
+                if ri == rj: continue
+                a, b = sets[i], sets[j]
+                if len(a & b) >= similarity * len(a | b):
+                    parent[max(ri, rj)] = min(ri, rj)
+            bucket.append(i)
+
+    groups = {}
+    for i in range(len(articles)):
+        groups.setdefault(find(i), []).append(articles[i])
+    return [groups[root] for root in sorted(groups)]
+
+def representative(members):
+    # The fullest write-up stands in for the story; ties go to the first one listed
+    return max(members, key=lambda item: len(item.get('description', '')))
+
+def collapse(articles, similarity=SIMILARITY):
+    # One article per story, its source_name listing every outlet that carried it.
+    # Each returned dict is a copy with the original articles under "members".
+    stories = []
+    for members in cluster(articles, similarity):
+        rep = dict(representative(members))
+        sources = []
+        for item in members:
+            name = item.get('source_name', 'Unknown')
+            if name not in sources: sources.append(name)
+        rep['source_name'] = ", ".join(sources)
+        rep['members'] = members
+        stories.append(rep)
+    return stories
@@ -0,0 +1,327 @@
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+import GetNews
+import Metrics
+import ArticleStore
+
+# Full-article text for briefings. Feeds only carry a teaser (GetNews keeps 500 characters),
+# so before a briefing the linked pages can be downloaded and their main text extracted:
+#
+#   articles = Enrich.enrich(articles)          # same articles, description = the page's text
+#
+# Only the articles handed in are touched: the filtered selection for --output / jobs, or the
+# rows ticked in the GUI. Pages are cached in page_cache.db by URL, with the text stored under
+# a hash of the downloaded page, so a briefing only downloads links it hasn't seen before.
+# Links that failed are remembered for a day rather than retried on every run.
+#
+# Downloads share GetNews' per-host limit and also wait POLITE_DELAY between requests to the
+# same host, so a selection full of one outlet's links is fetched gently.
+
+PAGE_CACHE_FILE = "page_cache.db"
+PAGE_TTL_DAYS = 30          # Cached pages are re-downloaded after this long
+FAILURE_TTL = 24 * 3600     # Seconds before a link that failed is tried again
+PAGE_CACHE_MAX_MB = 200
+ENRICH_WORKERS = 8          # Pages downloaded in parallel
+PAGE_TIMEOUT = 15           # Seconds allowed per page (connect + full body)
+POLITE_DELAY = 1.0          # Seconds between request starts to one host
+MAX_PAGE_BYTES = 2 * 1024 * 1024 # Anything past this is ignored
+MAX_TEXT_CHARS = 6000       # Text handed to the briefing per article (about 1500 tokens)
+MIN_PARAGRAPH = 40          # Shorter blocks are mostly bylines, captions and buttons
+MIN_MARKED = 400            # Text inside <article>/<main> needed to trust that markup
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url       TEXT PRIMARY KEY,
+    hash      TEXT,
+    error     TEXT,
+    fetched   REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS texts (
+    hash      TEXT PRIMARY KEY,
+    text      TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_fetched ON pages(fetched);
+CREATE INDEX IF NOT EXISTS idx_texts_last_used ON texts(last_used);
+"""
+
+# ==============================================================================
+# PAGE CACHE
+# ==============================================================================
+
+class PageCache:
+    def __init__(self, path=PAGE_CACHE_FILE, ttl_days=PAGE_TTL_DAYS, max_mb=PAGE_CACHE_MAX_MB):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, url):
+        # (True, text) for a cached page (text is "" when the link failed), (False, None) if it needs fetching
+        conn = self._conn()
+        row = conn.execute("SELECT p.hash, p.error, p.fetched, t.text FROM pages p LEFT JOIN texts t ON t.hash = p.hash "
+                           "WHERE p.url = ?", (url,)).fetchone()
+        if row is None: return False, None
+        page_hash, error, fetched, text = row
+        age = time.time() - fetched
+        if error is not None:
+            return (True, "") if age < FAILURE_TTL else (False, None)
+        if text is None or age > self.ttl: return False, None
+        now = time.time()
+        with conn:
+            conn.execute("UPDATE pages SET last_used = ? WHERE url = ?", (now, url))
+            conn.execute("UPDATE texts SET last_used = ? WHERE hash = ?", (now, page_hash))
+        return True, text
+
+    def text_for(self, page_hash):
+        # Text already extracted from a page with these exact bytes, or None
+        row = self._conn().execute("SELECT text FROM texts WHERE hash = ?", (page_hash,)).fetchone()
+        return None if row is None else row[0]
+
+    def put(self, url, page_hash, text=None):
+        now = time.time()
+        with self._conn() as conn:
+            if text is not None:
+                conn.execute("INSERT OR REPLACE INTO texts (hash, text, size, last_used) VALUES (?, ?, ?, ?)",
+                             (page_hash, text, len(text.encode("utf-8")), now))
+            conn.execute("INSERT OR REPLACE INTO pages (url, hash, error, fetched, last_used) VALUES (?, ?, NULL, ?, ?)",
+                         (url, page_hash, now, now))
+
+    def put_error(self, url, error):
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO pages (url, hash, error, fetched, last_used) VALUES (?, NULL, ?, ?, ?)",
+                         (url, str(error)[:200], now, now))
+
+    def evict(self):
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.execute("DELETE FROM pages WHERE (error IS NULL AND fetched < ?) OR (error IS NOT NULL AND fetched < ?)",
+                         (now - self.ttl, now - FAILURE_TTL))
+            conn.execute("DELETE FROM texts WHERE hash NOT IN (SELECT hash FROM pages WHERE hash IS NOT NULL)")
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM texts").fetchone()[0]
+            if total <= self.max_bytes: return
+            # Oldest-used first until we're back under the cap
+            for page_hash, size in conn.execute("SELECT hash, size FROM texts ORDER BY last_used").fetchall():
+                conn.execute("DELETE FROM texts WHERE hash = ?", (page_hash,))
+                conn.execute("DELETE FROM pages WHERE hash = ?", (page_hash,))
+                total -= size
+                if total <= self.max_bytes: break
+
+# ==============================================================================
+# TEXT EXTRACTION
+# ==============================================================================
+
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "header", "footer", "aside", "form",
+             "button", "select", "iframe", "figure", "figcaption"}
+BLOCK_TAGS = {"p", "h1", "h2", "h3", "h4", "li", "blockquote", "pre", "td", "dd"}
+CONTAINER_TAGS = {"div", "section", "article", "main", "body", "td"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+
+_SPACE = re.compile(r"\s+")
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w-]+)""", re.IGNORECASE)
+
+class _TextParser(HTMLParser):
+    # Collects text blocks (paragraphs, headings, list items) outside navigation and scripts,
+    # noting which container element each sits in and whether it is inside <article>/<main>
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []         # (tag, container id or None, marked)
+        self.skip = 0
+        self.marked = 0         # Depth inside <article>, <main> or itemprop=articleBody
+        self.containers = [None] # container id -> parent container id (0 is the document)
+        self.blocks = []        # (container id, inside article, text)
+        self.parts = None
+
+    def _flush(self):
+        if self.parts is not None:
+            text = _SPACE.sub(" ", "".join(self.parts)).strip()
+            if text: self.blocks.append((self._container(), self.marked > 0, text))
+            self.parts = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            if tag == "br" and self.parts is not None: self.parts.append(" ")
+            return
+        attrs = dict(attrs)
+        marked = tag in ("article", "main") or attrs.get("itemprop") == "articleBody"
+        if tag in SKIP_TAGS and not marked: self.skip += 1
+        if tag in BLOCK_TAGS or tag in CONTAINER_TAGS: self._flush()
+        cid = None
+        if tag in CONTAINER_TAGS:
+            cid = len(self.containers)
+            self.containers.append(self._container())
+        self.stack.append((tag, cid, marked))
+        if marked: self.marked += 1
+        if tag in BLOCK_TAGS and not self.skip: self.parts = []
+
+    def handle_endtag(self, tag):
+        # Pop back to the matching start tag; stray end tags are ignored
+        if not any(t == tag for t, _, _ in self.stack): return
+        while self.stack:
+            t, cid, marked = self.stack.pop()
+            if t in BLOCK_TAGS or cid is not None: self._flush()
+            if t in SKIP_TAGS and not marked: self.skip -= 1
+            if marked: self.marked -= 1
+            if t == tag: break
+
+    def handle_data(self, data):
+        if self.parts is not None and not self.skip: self.parts.append(data)
+
+    def _container(self):
+        for _, cid, _ in reversed(self.stack):
+            if cid is not None: return cid
+        return 0
+
+def extract_text(html):
+    # Main text of an article page, paragraphs separated by blank lines ("" if none found).
+    # Text inside <article>/<main> wins when there is enough of it; otherwise the container
+    # holding the most paragraph text is taken, together with its sibling containers (bodies
+    # split into several <div>s).
+    parser = _TextParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        pass # Keep whatever was parsed before the markup went bad
+    parser._flush()
+    blocks = [(cid, marked, text) for cid, marked, text in parser.blocks if len(text) >= MIN_PARAGRAPH]
+    if not blocks: return ""
+    marked = [text for _, inside, text in blocks if inside]
+    if sum(map(len, marked)) >= MIN_MARKED:
+        return "\n\n".join(marked)
+    score = {}
+    for cid, _, text in blocks: score[cid] = score.get(cid, 0) + len(text)
+    best = max(score, key=score.get)
+    parent = parser.containers[best]
+    return "\n\n".join(text for cid, _, text in blocks if cid == best or (parent is not None and parser.containers[cid] == parent))
+
+# ==============================================================================
+# FETCHING
+# ==============================================================================
+
+_next_start = {}            # host -> monotonic time the next request to it may start
+_next_start_guard = threading.Lock()
+
+def _wait_turn(url, cancel=None):
+    # Reserves this request's slot on its host, then sleeps until it comes round
+    host = urlparse(url).netloc.lower()
+    with _next_start_guard:
+        now = time.monotonic()
+        start = max(now, _next_start.get(host, 0))
+        _next_start[host] = start + POLITE_DELAY
+    if start > now:
+        if cancel is not None:
+            if cancel.wait(start - now): raise CancelledError()
+        else:
+            time.sleep(start - now)
+
+def fetch_page(url, timeout=PAGE_TIMEOUT, per_host=GetNews.PER_HOST_LIMIT, cancel=None):
+    # Returns (body bytes, charset from the headers or None). Raises on HTTP errors and non-HTML pages.
+    import urllib.request
+    deadline = time.monotonic() + timeout
+    with GetNews._host_semaphore(url, per_host):
+        _wait_turn(url, cancel)
+        if cancel is not None and cancel.is_set(): raise CancelledError()
+        req = urllib.request.Request(url, headers={"User-Agent": GetNews.USER_AGENT, "Accept": "text/html,*/*;q=0.5"})
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            kind = resp.headers.get_content_type()
+            if kind not in ("text/html", "application/xhtml+xml"):
+                raise ValueError(f"not a web page ({kind})")
+            body = GetNews.read_body(resp, deadline, timeout, cancel, MAX_PAGE_BYTES)
+            charset = resp.headers.get_content_charset()
+    Metrics.count("page_bytes_downloaded", len(body))
+    return body, charset
+
+def decode_page(body, charset=None):
+    if charset is None:
+        m = _META_CHARSET.search(body[:4096])
+        charset = m.group(1).decode("ascii") if m else "utf-8"
+    try:
+        return body.decode(charset, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+def page_texts(urls, workers=ENRICH_WORKERS, timeout=PAGE_TIMEOUT, per_host=GetNews.PER_HOST_LIMIT, cache=None,
+               cancel=None, log=print):
+    # {url: main text} for the given links ("" when a page failed or had no usable text).
+    # Cached pages are reused; the rest are downloaded in parallel.
+    if cache is None: cache = PageCache()
+    texts = {}; todo = []
+    for url in dict.fromkeys(urls):
+        found, text = cache.get(url)
+        if found: texts[url] = text
+        else: todo.append(url)
+    Metrics.count("page_cache_hits", len(texts))
+    log(f"Full text: {len(texts)} pages cached, {len(todo)} to download")
+    if not todo: return texts
+
+    def job(url):
+        try:
+            body, charset = fetch_page(url, timeout, per_host, cancel)
+        except CancelledError:
+            raise
+        except Exception as e:
+            Metrics.count("page_failures")
+            cache.put_error(url, e)
+            return url, ""
+        page_hash = hashlib.sha1(body).hexdigest()
+        # An unchanged page (same bytes as a cached one) needs no new extraction. Another
+        # process may evict that text at any moment, so it is read once and re-stored with the page.
+        text = cache.text_for(page_hash)
+        if text is None:
+            with Metrics.timer("extract"): text = extract_text(decode_page(body, charset))
+        cache.put(url, page_hash, text)
+        return url, text
+
+    with Metrics.timer("enrich"), ThreadPoolExecutor(max_workers=max(1, min(workers, len(todo)))) as pool:
+        futures = [pool.submit(job, url) for url in todo]
+        try:
+            for future in futures:
+                url, text = future.result()
+                texts[url] = text
+        except CancelledError:
+            for future in futures: future.cancel()
+            raise
+    cache.evict()
+    return texts
+
+def enrich(articles, workers=ENRICH_WORKERS, timeout=PAGE_TIMEOUT, per_host=GetNews.PER_HOST_LIMIT, cache=None,
+           cancel=None, log=print):
+    # The articles with each description replaced by its page's main text (trimmed to
+    # MAX_TEXT_CHARS). Articles whose page gave nothing longer than the teaser keep it.
+    articles = [ArticleStore.Article.from_dict(a) for a in articles]
+    links = [a.link for a in articles if a.link.startswith(("http://", "https://"))]
+    if not links: return articles
+    texts = page_texts(links, workers, timeout, per_host, cache, cancel, log)
+    out = []
+    for a in articles:
+        text = texts.get(a.link, "")
+        if len(text) <= len(a.description):
+            out.append(a)
+            continue
+        if len(text) > MAX_TEXT_CHARS: text = text[:MAX_TEXT_CHARS].rsplit(" ", 1)[0] + " ..."
+        out.append(ArticleStore.Article(a.guid, a.link, a.title, text, a.published, a.downloaded, a.source_name,
+                                        a.published_ts, a.downloaded_ts))
+    return out
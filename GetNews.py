@@ -1,12 +1,29 @@
-import feedparser
 import os
+import ArticleStore
+import Metrics
 import json
+import time
+import threading
+import contextlib
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, CancelledError, as_completed
 from datetime import datetime, timedelta
 
 # Define file paths
 FEEDS_FILE = "feeds.json"
 ENTRIES_FILE = "entries.xml"
 ARCHIVE_FILE = "archive.xml"
+DB_FILE = "newsdesk.db"
+# Held for the length of a fetch so a GUI, a cron job and the daemon never fetch at once
+LOCK_FILE = "newsdesk.lock"
+# Per-feed HTTP validators live next to feeds.json
+FEED_CACHE_FILE = os.path.join(os.path.dirname(FEEDS_FILE), "feed_cache.json")
+
+# Fetch tuning
+FETCH_WORKERS = 16      # Feeds downloaded in parallel
+FETCH_TIMEOUT = 20      # Seconds allowed per feed (connect + full body)
+PER_HOST_LIMIT = 2      # Max simultaneous requests to one host
+USER_AGENT = "NewsDesk/3.2 (+https://github.com/BuckRogers1965/News-Desk)"
 
 # Load Feed Config
 def load_feed_config():
@@ -15,78 +32,469 @@ def load_feed_config():
     with open(FEEDS_FILE, 'r') as f:
         return json.load(f)
 
-# The logic remains mostly the same, just handling the source better
+# Conditional GET state: {url: {"etag", "last_modified", "content_hash", "last_fetch"}}
+def load_feed_cache():
+    if not os.path.exists(FEED_CACHE_FILE):
+        return {}
+    try:
+        with open(FEED_CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except (ValueError, OSError):
+        return {} # A corrupt cache just means one full fetch
+
+def save_feed_cache(cache):
+    atomic_write(FEED_CACHE_FILE, json.dumps(cache, indent=1))
+
+@contextlib.contextmanager
+def atomic_file(path):
+    # Yields a file to write; on success it is flushed to disk and renamed over `path`.
+    # A crash or error part way leaves the old file (or none), never half of the new one.
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp): os.remove(tmp)
+
+def atomic_write(path, text):
+    with atomic_file(path) as f: f.write(text)
+
+def _try_lock(f):
+    try:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+def _unlock(f):
+    if os.name == "nt":
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+@contextlib.contextmanager
+def fetch_lock(cancel=None):
+    # Cross-process lock on LOCK_FILE, released by the OS if the holder dies. Held by fetches
+    # and by ColdArchive's compact / prune, which rewrite the same segments a fetch compacts into.
+    # Waits for another holder to finish; yields False instead if `cancel` is set while waiting.
+    with open(LOCK_FILE, 'a+') as f:
+        waiting = False
+        while not _try_lock(f):
+            if not waiting: print("Another fetch or compaction is running, waiting for it to finish...")
+            waiting = True
+            if cancel is not None and cancel.wait(0.5):
+                yield False
+                return
+            if cancel is None: time.sleep(0.5)
+        try:
+            yield True
+        finally:
+            _unlock(f)
+
+# Shared article store. The first open imports any legacy entries.xml / archive.xml.
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArticleStore.ArticleStore(DB_FILE)
+            migrate_xml_files(_store)
+        return _store
+
+def migrate_xml_files(store):
+    # One-time import; the XML files are renamed to *.migrated rather than deleted
+    for file_path, archived in ((ENTRIES_FILE, False), (ARCHIVE_FILE, True)):
+        if not os.path.exists(file_path): continue
+        added = store.add(iter_xml_entries(file_path), archived=archived)
+        os.replace(file_path, file_path + ".migrated")
+        print(f"Migrated {added} articles from {file_path} into {DB_FILE}")
+
+def last_fetch_time():
+    # Seconds since the epoch of the last completed fetch, or None if we never fetched
+    value = get_store().get_meta("last_fetch")
+    return float(value) if value else None
+
+# Process-wide cache of load_entries() results, keyed on the backing files' mtime/size.
+# The returned articles are shared, so callers must treat them as read-only.
+# Articles are ArticleStore.Article records; they read like the old dicts (item['title'], item.get()).
+_entries_cache = {}
+_entries_cache_lock = threading.Lock()
+
+def _file_signature(file_path):
+    # The store changes through its -wal file as well as the main db file
+    paths = (DB_FILE, DB_FILE + "-wal") if file_path in (ENTRIES_FILE, ARCHIVE_FILE) else (file_path,)
+    sig = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+def invalidate_entries_cache():
+    with _entries_cache_lock:
+        _entries_cache.clear()
+
+# ENTRIES_FILE / ARCHIVE_FILE name the live and archived sets in the store.
+# Any other path is read/written as the legacy XML format (handy for exports).
 def load_entries(file_path):
-    if not os.path.exists(file_path): return {}
-    entries = {}; item_data = None
-    with open(file_path, 'r', encoding='utf-8') as file:
-        for line in file:
-            line = line.strip()
+    if file_path in (ENTRIES_FILE, ARCHIVE_FILE): get_store() # Make sure migration has run before we stat
+    sig = _file_signature(file_path)
+    with _entries_cache_lock:
+        cached = _entries_cache.get(file_path)
+        if cached and cached[0] == sig:
+            return cached[1]
+    if file_path in (ENTRIES_FILE, ARCHIVE_FILE):
+        entries = get_store().load(archived=(file_path == ARCHIVE_FILE))
+    else:
+        entries = load_xml_entries(file_path)
+    with _entries_cache_lock:
+        _entries_cache[file_path] = (sig, entries)
+    return entries
+
+def iter_entries(file_path, since=None, by="downloaded"):
+    # Lazily yield entries, newest first by download or publication time (`by`), stopping at
+    # `since` (epoch seconds, inclusive). Nothing beyond the requested window is read into memory.
+    if file_path == ENTRIES_FILE:
+        yield from get_store().iter(archived=False, since=since, by=by)
+        return
+    if file_path == ARCHIVE_FILE:
+        # The archive in newsdesk.db, plus any compressed monthly segments the window reaches back into
+        import heapq, ColdArchive
+        yield from heapq.merge(get_store().iter(archived=True, since=since, by=by), ColdArchive.iter_articles(since, by),
+                               key=lambda a: getattr(a, ArticleStore.TIME_ORDER[by]), reverse=True)
+        return
+    # XML files aren't ordered by date, so this can only filter, not stop early
+    column = ArticleStore.TIME_ORDER[by]
+    for entry in iter_xml_entries(file_path):
+        entry = ArticleStore.Article.from_dict(entry)
+        if since is None or getattr(entry, column) >= since:
+            yield entry
+
+def save_entries(file_path, entries):
+    # Upserts into the store; rows not in `entries` are left alone
+    invalidate_entries_cache()
+    if file_path in (ENTRIES_FILE, ARCHIVE_FILE):
+        get_store().upsert(entries.values(), archived=(file_path == ARCHIVE_FILE))
+        return
+    save_xml_entries(file_path, entries)
+
+def search_entries(query, include_archive=False, limit=None, since=None, by="downloaded"):
+    # Ranked full-text search ("phrase", AND / OR / NOT, prefix*); best match first.
+    # With the archive, cold segments from `since` on are searched too; their matches follow the store's.
+    found = get_store().search(query, archived=None if include_archive else False, limit=limit)
+    if include_archive and (limit is None or len(found) < limit):
+        import ColdArchive
+        cold = ColdArchive.search(query, since, by)
+        found += cold if limit is None else cold[:limit - len(found)]
+    return found
+
+# Legacy / export XML: one <tag>value</tag> per line. Values are escaped, newlines included
+# (&#10;), so every value stays on its line. Files written before that could have raw
+# newlines inside a value; the reader joins those lines back up.
+XML_FIELDS = ("guid", "link", "title", "description", "published", "downloaded", "source_name")
+
+def _xml_escape(text):
+    return (str(text).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            .replace("\r", "&#13;").replace("\n", "&#10;"))
+
+def _xml_unescape(text):
+    if "&" not in text: return text
+    return (text.replace("&#10;", "\n").replace("&#13;", "\r").replace("&lt;", "<").replace("&gt;", ">")
+            .replace("&amp;", "&"))
+
+def iter_xml_entries(file_path):
+    if not os.path.exists(file_path): return
+    item_data = None
+    field = None; parts = [] # A value still open from an earlier line
+    with open(file_path, 'r', encoding='utf-8', newline='') as file:
+        for raw in file:
+            if field is not None:
+                end = raw.find(f"</{field}>")
+                if end < 0:
+                    parts.append(raw)
+                    continue
+                parts.append(raw[:end])
+                item_data[field] = _xml_unescape("".join(parts))
+                field = None
+                continue
+            line = raw.strip()
             if line.startswith("<item>"): item_data = {}
             elif line.startswith("</item>") and item_data:
-                if "guid" in item_data: entries[item_data["guid"]] = item_data
+                if "guid" in item_data: yield item_data
                 item_data = None
-            elif line.startswith("<guid>") and item_data is not None: item_data["guid"] = line[6:-7]
-            elif line.startswith("<link>") and item_data is not None: item_data["link"] = line[6:-7]
-            elif line.startswith("<title>") and item_data is not None: item_data["title"] = line[7:-8]
-            elif line.startswith("<description>") and item_data is not None: item_data["description"] = line[13:-14]
-            elif line.startswith("<published>") and item_data is not None: item_data["published"] = line[11:-12]
-            elif line.startswith("<downloaded>") and item_data is not None: item_data["downloaded"] = line[12:-13]
-            elif line.startswith("<source_name>") and item_data is not None: item_data["source_name"] = line[13:-14]
-    return entries
+            elif item_data is not None and line.startswith("<"):
+                tag = line[1:line.find(">")]
+                if tag not in XML_FIELDS: continue
+                close = f"</{tag}>"
+                if line.endswith(close):
+                    item_data[tag] = _xml_unescape(line[len(tag) + 2:-len(close)])
+                else:
+                    field = tag
+                    parts = [raw.lstrip()[len(tag) + 2:]]
 
-def save_entries(file_path, entries):
-    with open(file_path, 'w', encoding='utf-8') as file:
+def load_xml_entries(file_path):
+    return {entry["guid"]: ArticleStore.Article.from_dict(entry) for entry in iter_xml_entries(file_path)}
+
+def save_xml_entries(file_path, entries):
+    # Written to a temp file and renamed into place, so an interrupted export never truncates the old one
+    with atomic_file(file_path) as file:
         file.write("<rss><channel><title>Aggregated Feed</title>\n")
         for entry in entries.values():
             file.write("    <item>\n")
-            file.write(f"      <guid>{entry.get('guid','')}</guid>\n")
-            file.write(f"      <link>{entry.get('link','')}</link>\n")
-            file.write(f"      <title>{entry.get('title','').replace('<','&lt;').replace('>','&gt;')}</title>\n")
-            file.write(f"      <description>{entry.get('description','').replace('<','&lt;').replace('>','&gt;')}</description>\n")
-            file.write(f"      <published>{entry.get('published','')}</published>\n")
-            file.write(f"      <downloaded>{entry.get('downloaded','')}</downloaded>\n")
-            file.write(f"      <source_name>{entry.get('source_name','Unknown')}</source_name>\n")
+            for tag in XML_FIELDS:
+                default = "Unknown" if tag == "source_name" else ""
+                file.write(f"      <{tag}>{_xml_escape(entry.get(tag, default))}</{tag}>\n")
             file.write("    </item>\n")
         file.write("  </channel></rss>\n")
 
-def process_feeds_logic():
+# One semaphore per host so a pool of workers can't hammer a single server
+_host_locks = {}
+_host_locks_guard = threading.Lock()
+
+def _host_semaphore(url, limit):
+    key = (urlparse(url).netloc.lower(), limit)
+    with _host_locks_guard:
+        if key not in _host_locks:
+            _host_locks[key] = threading.BoundedSemaphore(limit)
+        return _host_locks[key]
+
+def read_body(resp, deadline, timeout, cancel=None, limit=None):
+    # The socket timeout only covers single reads, so enforce the whole-body deadline here.
+    # With `limit`, stops after that many bytes and returns what arrived.
+    chunks = []; size = 0
+    while limit is None or size < limit:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"timed out after {timeout}s")
+        if cancel is not None and cancel.is_set(): raise CancelledError()
+        chunk = resp.read(65536)
+        if not chunk: break
+        chunks.append(chunk); size += len(chunk)
+    return b"".join(chunks)
+
+def fetch_feed(feed_item, timeout=FETCH_TIMEOUT, per_host=PER_HOST_LIMIT, validators=None, cancel=None):
+    # Returns the parsed feed, or None when the server (or the body hash) says nothing changed.
+    # `validators` is this feed's cache record and is updated in place; the new ETag /
+    # Last-Modified / content hash of a parsed feed only take effect with commit_validators().
+    # `cancel` is an optional threading.Event; setting it aborts the download with CancelledError.
+    # Only fetching needs these; reading the store shouldn't pay for feedparser's import
+    import hashlib
+    import feedparser
+    import urllib.error
+    import urllib.request
+    url = feed_item['url']
+    if validators is None: validators = {}
+    headers = {"User-Agent": USER_AGENT}
+    if validators.get("etag"): headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"): headers["If-Modified-Since"] = validators["last_modified"]
+
+    deadline = time.monotonic() + timeout
+    with _host_semaphore(url, per_host):
+        if cancel is not None and cancel.is_set(): raise CancelledError()
+        req = urllib.request.Request(url, headers=headers)
+        try:
+            resp = urllib.request.urlopen(req, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                validators["last_fetch"] = datetime.now().isoformat(timespec="seconds")
+                return None
+            raise
+        with resp:
+            body = read_body(resp, deadline, timeout, cancel)
+            resp_headers = dict(resp.headers.items())
+
+    validators.setdefault("health", {})["bytes"] = len(body)
+    Metrics.count("bytes_downloaded", len(body))
+    content_hash = hashlib.sha1(body).hexdigest()
+    validators["last_fetch"] = datetime.now().isoformat(timespec="seconds")
+    fresh = {"content_hash": content_hash}
+    for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified")):
+        fresh[key] = next((v for k, v in resp_headers.items() if k.lower() == header.lower()), None)
+    # New validators wait in "pending" until the caller has built this feed's entries
+    # (commit_validators), so a body that fails to parse is downloaded and parsed again next time
+    validators["pending"] = fresh
+    if content_hash == validators.get("content_hash"):
+        commit_validators(validators)
+        return None # Server ignores validators but sent the same bytes, skip the parse
+    start = time.perf_counter()
+    parsed = feedparser.parse(body, response_headers=resp_headers)
+    Metrics.observe("parse", time.perf_counter() - start)
+    return parsed
+
+def commit_validators(record):
+    # Keeps the validators fetch_feed left pending: later fetches may now get 304 / same bytes
+    fresh = record.pop("pending", None)
+    if fresh is None: return
+    for key, value in fresh.items():
+        if value: record[key] = value
+        else: record.pop(key, None)
+
+def record_health(record, seconds, parsed, error):
+    # Per-feed health in the feed's feed_cache.json record, kept across runs (see Metrics.feed_health)
+    h = record.setdefault("health", {})
+    h["fetches"] = h.get("fetches", 0) + 1
+    h["last_seconds"] = round(seconds, 3)
+    h["avg_seconds"] = round(seconds if "avg_seconds" not in h else h["avg_seconds"] + 0.2 * (seconds - h["avg_seconds"]), 3)
+    if error is not None:
+        h["failures"] = h.get("failures", 0) + 1
+        h["error_streak"] = h.get("error_streak", 0) + 1
+        h["last_error"] = str(error)[:200]
+        return
+    h["error_streak"] = 0
+    h["last_ok"] = datetime.now().isoformat(timespec="seconds")
+    if parsed is not None: h["entries"] = len(parsed.entries)
+
+def fetch_all_feeds(feed_config, workers=FETCH_WORKERS, timeout=FETCH_TIMEOUT, per_host=PER_HOST_LIMIT, cache=None,
+                    progress=None, cancel=None):
+    # Returns (feed_item, parsed_or_None, error_or_None) in feed_config order, whatever order they finish in.
+    # parsed is None with no error when the feed was unchanged since the last fetch.
+    # progress(done, total, feed_item, error) is called on the calling thread as each feed finishes.
+    # Feeds not fetched because `cancel` was set come back with a CancelledError.
+    if cache is None: cache = {}
+    for feed_item in feed_config:
+        cache.setdefault(feed_item['url'], {})
+
+    def job(feed_item):
+        record = cache[feed_item['url']]
+        start = time.monotonic()
+        try:
+            d = fetch_feed(feed_item, timeout, per_host, record, cancel)
+            record_health(record, time.monotonic() - start, d, None)
+            return feed_item, d, None
+        except Exception as e:
+            if not isinstance(e, CancelledError): record_health(record, time.monotonic() - start, None, e)
+            return feed_item, None, e
+
+    if not feed_config: return []
+    results = [(feed_item, None, CancelledError()) for feed_item in feed_config]
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(feed_config)))) as pool:
+        futures = {pool.submit(job, feed_item): i for i, feed_item in enumerate(feed_config)}
+        for future in as_completed(futures):
+            if future.cancelled(): continue
+            feed_item, d, error = results[futures[future]] = future.result()
+            done += 1
+            if progress is not None: progress(done, len(feed_config), feed_item, error)
+            if cancel is not None and cancel.is_set():
+                pool.shutdown(wait=True, cancel_futures=True)
+    return results
+
+def process_feeds_logic(workers=FETCH_WORKERS, timeout=FETCH_TIMEOUT, per_host=PER_HOST_LIMIT, progress=None, cancel=None,
+                        only=None, on_checked=None):
+    # Returns a summary dict: added / archived / unchanged / errors / cancelled, plus
+    # new_by_feed {url: new articles} and failed [urls] for the feeds that were checked.
+    # Feeds that finished before a cancel are still saved. `only` limits the run to those feed URLs.
+    # Only one fetch runs at a time across processes; a second one waits for the first.
+    # on_checked(feed_cache, new_by_feed, failed) may update feed_cache.json's entries while the
+    # lock is still held; it is called just before the cache is saved, unless the run was cancelled.
     print("--- Fetching News ---")
-    feed_config = load_feed_config()
-    existing_entries = load_entries(ENTRIES_FILE)
-    archive_entries = load_entries(ARCHIVE_FILE)
+    all_feeds = load_feed_config()
+    feed_config = all_feeds if only is None else [f for f in all_feeds if f['url'] in only]
+    with fetch_lock(cancel) as locked:
+        if not locked:
+            print("Cancelled while waiting for the other fetch.")
+            return {"added": 0, "archived": 0, "unchanged": 0, "errors": 0, "cancelled": len(feed_config),
+                    "new_by_feed": {}, "failed": []}
+        return _process_feeds(all_feeds, feed_config, workers, timeout, per_host, progress, cancel, on_checked)
+
+def _process_feeds(all_feeds, feed_config, workers, timeout, per_host, progress, cancel, on_checked):
+    # The fetch itself, under fetch_lock. Writes only the new articles: each row goes in once,
+    # in one SQLite transaction (WAL journal), so a crash keeps the articles stored before it.
+    import calendar
+    store = get_store()
     new_entries = {}
+    today = datetime.now().strftime("%Y-%m-%d")
+    now = int(time.time())
+    feed_cache = load_feed_cache()
+    skipped = 0; errors = 0; cancelled = 0
+    feed_guids = {}; failed = []
 
-    for feed_item in feed_config:
-        print(f"Checking: {feed_item['name']}")
+    print(f"Checking {len(feed_config)} feeds ({workers} workers, {timeout}s timeout)")
+    with Metrics.timer("fetch"):
+        results = fetch_all_feeds(feed_config, workers, timeout, per_host, feed_cache, progress, cancel)
+    for feed_item, d, error in results:
+        record = feed_cache[feed_item['url']]
+        if isinstance(error, CancelledError):
+            cancelled += 1
+            continue
+        if error is not None:
+            record.pop("pending", None) # e.g. feedparser failed: fetch the same body again next time
+            errors += 1
+            failed.append(feed_item['url'])
+            print(f"Error fetching {feed_item['name']}: {error}")
+            continue
+        guids = feed_guids.setdefault(feed_item['url'], [])
+        if d is None:
+            skipped += 1
+            continue
         try:
-            d = feedparser.parse(feed_item['url'])
             for entry in d.entries:
                 guid = entry.get('id', entry.get('link'))
-                if guid not in existing_entries:
-                    new_entries[guid] = {
-                        "guid": guid,
-                        "link": entry.get('link', ''),
-                        "title": entry.get('title', 'No Title'),
-                        "description": entry.get('summary', '')[:500], # Truncate massive descriptions
-                        "published": entry.get('published', ''),
-                        "downloaded": datetime.now().strftime("%Y-%m-%d"),
-                        "source_name": feed_item['name'] # Bind to the source name
-                    }
+                if guid not in new_entries:
+                    guids.append(guid)
+                    # feedparser has already read the date into UTC; fall back to the download time
+                    published_parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+                    new_entries[guid] = ArticleStore.Article(
+                        guid,
+                        link=entry.get('link', ''),
+                        title=entry.get('title', 'No Title'),
+                        description=entry.get('summary', '')[:500], # Truncate massive descriptions
+                        published=entry.get('published', ''),
+                        downloaded=today,
+                        source_name=feed_item['name'], # Bind to the source name
+                        published_ts=calendar.timegm(published_parsed) if published_parsed else now,
+                        downloaded_ts=now
+                    )
+            commit_validators(record)
         except Exception as e:
+            # Keep the old validators, so the next run doesn't skip this body as unchanged
+            record.pop("pending", None)
+            errors += 1
+            failed.append(feed_item['url'])
             print(f"Error parsing {feed_item['name']}: {e}")
 
-    # Cleanup Old
-    for guid, entry in list(existing_entries.items()):
-        d_date = datetime.strptime(entry["downloaded"], "%Y-%m-%d")
-        if (datetime.now() - d_date) > timedelta(days=7):
-            archive_entries[guid] = entry
-            del existing_entries[guid]
-
-    existing_entries.update(new_entries)
-    save_entries(ENTRIES_FILE, existing_entries)
-    save_entries(ARCHIVE_FILE, archive_entries)
-    print(f"Done. {len(new_entries)} new articles.")
+    # Only rows we have never seen (live or archived) are written
+    with Metrics.timer("store"):
+        known = store.existing(new_entries)
+        new_by_feed = {url: sum(1 for g in guids if g not in known) for url, guids in feed_guids.items()}
+        added = store.add(new_entries.values())
+        invalidate_entries_cache()
+
+        # Cleanup Old
+        archived = store.archive_downloaded_before((datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d"))
+        # Old archived articles move to compressed monthly segments, at most once a day
+        import ColdArchive
+        ColdArchive.compact_if_due(store)
+    if not cancelled: store.set_meta("last_fetch", time.time())
+
+    if on_checked is not None and not cancelled: on_checked(feed_cache, new_by_feed, failed)
+    # Forget validators for feeds that were removed from feeds.json
+    urls = set(f['url'] for f in all_feeds)
+    save_feed_cache({u: v for u, v in feed_cache.items() if u in urls})
+    Metrics.count("feeds_checked", len(feed_config) - cancelled)
+    Metrics.count("feeds_unchanged", skipped)
+    Metrics.count("feeds_failed", errors)
+    Metrics.count("entries_parsed", len(new_entries))
+    Metrics.count("articles_added", added)
+    if cancelled: print(f"Cancelled. {cancelled} feeds were not fetched.")
+    print(f"Done. {added} new articles, {archived} archived. {skipped} of {len(feed_config)} feeds unchanged.")
+    return {"added": added, "archived": archived, "unchanged": skipped, "errors": errors, "cancelled": cancelled,
+            "new_by_feed": new_by_feed, "failed": failed}
 
 if __name__ == "__main__":
     process_feeds_logic()
\ No newline at end of file
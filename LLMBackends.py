@@ -0,0 +1,241 @@
+import os
+import json
+import time
+import random
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from urllib.parse import urlparse
+from concurrent.futures import CancelledError
+import Metrics
+
+# Model backends. Each one exposes generate(prompt, on_text=None, cancel=None) -> text,
+# throttles itself to its requests-per-minute budget, retries 429/5xx with backoff
+# (honouring Retry-After), and keeps simple latency stats.
+#
+#   gemini  Google Gemini via google-generativeai (needs GEMINI_API_KEY)
+#   openai  Any OpenAI-style /v1/chat/completions server (needs OPENAI_API_KEY for api.openai.com)
+#   ollama  Local Ollama through its OpenAI-compatible endpoint, no key, no rate limit
+#
+# Pick one with --backend / --model / --base-url, or NEWSDESK_BACKEND / NEWSDESK_MODEL /
+# NEWSDESK_BASE_URL. MockLLMServer.py is a local stand-in for the openai/ollama protocol.
+
+DEFAULTS = {
+    "gemini": {"model": "gemini-flash-latest", "base_url": None, "rpm": 15},   # Free tier: 15 RPM
+    "openai": {"model": "gpt-4o-mini", "base_url": "https://api.openai.com", "rpm": 60},
+    "ollama": {"model": "llama3.1", "base_url": "http://localhost:11434", "rpm": 0},  # 0 = unlimited
+}
+MAX_RETRIES = 5
+BACKOFF_BASE = 2.0      # Seconds; doubles each retry, plus jitter
+REQUEST_TIMEOUT = 300   # Local models can take a while on big prompts
+
+class BackendError(Exception):
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+class RateLimiter:
+    # Sliding one-minute window shared by every thread that calls the model
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self.calls = deque()
+        self.lock = threading.Lock()
+
+    def acquire(self, cancel=None):
+        if not self.per_minute: return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.calls and now - self.calls[0] >= 60:
+                    self.calls.popleft()
+                if len(self.calls) < self.per_minute:
+                    self.calls.append(now)
+                    return
+                wait = 60 - (now - self.calls[0])
+            if cancel is not None and cancel.wait(min(wait, 1.0)): raise CancelledError()
+            if cancel is None: time.sleep(min(wait, 1.0))
+
+def _retryable(e):
+    status = getattr(e, "status", None) or getattr(e, "code", None)
+    try: status = int(status)
+    except (TypeError, ValueError): status = None
+    if status is not None: return status == 429 or status >= 500
+    return "429" in str(e) or "ResourceExhausted" in type(e).__name__
+
+class Backend(ABC):
+    # Subclasses implement _generate_once: one request, no retries. Throttling, retries and
+    # stats are handled here.
+    name = "base"
+
+    def __init__(self, model, requests_per_minute=0):
+        self.model = model
+        self.limiter = RateLimiter(requests_per_minute)
+        self.stats = {"calls": 0, "retries": 0, "errors": 0, "seconds": 0.0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def label(self):
+        return f"{self.name}/{self.model}"
+
+    @abstractmethod
+    def _generate_once(self, prompt, on_text, cancel):
+        # Returns the full response text, passing chunks to on_text as they arrive when it's given
+        ...
+
+    def generate(self, prompt, on_text=None, cancel=None):
+        attempt = 0
+        while True:
+            if cancel is not None and cancel.is_set(): raise CancelledError()
+            self.limiter.acquire(cancel)
+            emitted = []
+            def relay(text):
+                emitted.append(text)
+                if on_text is not None: on_text(text)
+            start = time.monotonic()
+            try:
+                text = self._generate_once(prompt, relay if on_text is not None else None, cancel)
+                elapsed = time.monotonic() - start
+                with self._stats_lock:
+                    self.stats["calls"] += 1
+                    self.stats["seconds"] += elapsed
+                Metrics.observe("llm_request", elapsed)
+                # Estimated at ~4 characters per token, the same rule Briefing packs prompts with
+                Metrics.count("llm_prompt_tokens", len(prompt) // 4)
+                Metrics.count("llm_output_tokens", len(text) // 4)
+                return text
+            except CancelledError:
+                raise
+            except Exception as e:
+                # Once streamed text has reached the caller a retry would duplicate it
+                if emitted or attempt >= MAX_RETRIES or not _retryable(e):
+                    with self._stats_lock: self.stats["errors"] += 1
+                    Metrics.count("llm_errors")
+                    raise
+                attempt += 1
+                delay = getattr(e, "retry_after", None) or BACKOFF_BASE * (2 ** (attempt - 1)) + random.uniform(0, 1)
+                with self._stats_lock: self.stats["retries"] += 1
+                Metrics.count("llm_retries")
+                print(f"{self.label}: {e}; retry {attempt}/{MAX_RETRIES} in {delay:.1f}s")
+                if cancel is not None:
+                    if cancel.wait(delay): raise CancelledError()
+                else:
+                    time.sleep(delay)
+
+    def summary(self):
+        calls = self.stats["calls"]
+        avg = self.stats["seconds"] / calls if calls else 0.0
+        return (f"{self.label}: {calls} calls, avg {avg:.2f}s, "
+                f"{self.stats['retries']} retries, {self.stats['errors']} errors")
+
+class GeminiBackend(Backend):
+    name = "gemini"
+
+    def __init__(self, model, api_key, requests_per_minute=DEFAULTS["gemini"]["rpm"]):
+        super().__init__(model, requests_per_minute)
+        if not api_key: raise BackendError("GEMINI_API_KEY not set.")
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.client = genai.GenerativeModel(model)
+
+    def _generate_once(self, prompt, on_text, cancel):
+        if on_text is None and cancel is None:
+            return self.client.generate_content(prompt).text
+        parts = []
+        for chunk in self.client.generate_content(prompt, stream=True):
+            if cancel is not None and cancel.is_set(): raise CancelledError()
+            text = getattr(chunk, "text", "")
+            parts.append(text)
+            if on_text is not None: on_text(text)
+        return "".join(parts)
+
+class OpenAICompatibleBackend(Backend):
+    # POST {base_url}/v1/chat/completions, streaming over server-sent events when asked.
+    # Connections are kept alive per thread and reused between requests.
+    name = "openai"
+
+    def __init__(self, model, base_url, api_key=None, requests_per_minute=0, name=None):
+        super().__init__(model, requests_per_minute)
+        if name: self.name = name
+        parsed = urlparse(base_url)
+        self.https = parsed.scheme == "https"
+        self.host = parsed.hostname
+        self.port = parsed.port or (443 if self.https else 80)
+        self.path = parsed.path.rstrip("/") + "/v1/chat/completions"
+        self.api_key = api_key
+        self._local = threading.local()
+
+    def _connection(self, fresh=False):
+        import http.client # Not needed at all with the Gemini backend
+        conn = getattr(self._local, "conn", None)
+        if conn is None or fresh:
+            if conn is not None: conn.close()
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = self._local.conn = cls(self.host, self.port, timeout=REQUEST_TIMEOUT)
+        return conn
+
+    def _request(self, body):
+        headers = {"Content-Type": "application/json"}
+        if self.api_key: headers["Authorization"] = f"Bearer {self.api_key}"
+        payload = json.dumps(body).encode("utf-8")
+        for fresh in (False, True):
+            conn = self._connection(fresh)
+            try:
+                conn.request("POST", self.path, body=payload, headers=headers)
+                return conn.getresponse()
+            except (ConnectionResetError, BrokenPipeError): # Includes http.client.RemoteDisconnected
+                if fresh: raise # The kept-alive socket had gone stale; one retry on a new one
+
+    def _generate_once(self, prompt, on_text, cancel):
+        stream = on_text is not None or cancel is not None
+        resp = self._request({"model": self.model, "messages": [{"role": "user", "content": prompt}], "stream": stream})
+        if resp.status != 200:
+            detail = resp.read().decode("utf-8", "replace")[:300]
+            retry_after = resp.getheader("Retry-After")
+            try: retry_after = float(retry_after) if retry_after else None
+            except ValueError: retry_after = None
+            raise BackendError(f"HTTP {resp.status}: {detail}", resp.status, retry_after)
+        if not stream:
+            data = json.loads(resp.read())
+            return data["choices"][0]["message"]["content"] or ""
+
+        parts = []
+        while True:
+            if cancel is not None and cancel.is_set():
+                self._connection(fresh=True) # Abandon the half-read response
+                raise CancelledError()
+            line = resp.readline()
+            if not line: break
+            line = line.strip()
+            if not line.startswith(b"data:"): continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                resp.read() # Drain so the connection can be reused
+                break
+            delta = json.loads(data)["choices"][0].get("delta", {}).get("content") or ""
+            if delta:
+                parts.append(delta)
+                if on_text is not None: on_text(delta)
+        return "".join(parts)
+
+# Backends are shared per (name, model, url) so every briefing in the process draws on
+# the same rate-limit window and kept-alive connections
+_backends = {}
+_backends_lock = threading.Lock()
+
+def get_backend(name=None, model=None, base_url=None):
+    name = (name or os.getenv("NEWSDESK_BACKEND") or "gemini").lower()
+    if name not in DEFAULTS:
+        raise BackendError(f"Unknown backend '{name}'. Choose from: {', '.join(DEFAULTS)}")
+    defaults = DEFAULTS[name]
+    model = model or os.getenv("NEWSDESK_MODEL") or defaults["model"]
+    base_url = base_url or os.getenv("NEWSDESK_BASE_URL") or defaults["base_url"]
+    with _backends_lock:
+        key = (name, model, base_url)
+        if key not in _backends:
+            if name == "gemini":
+                _backends[key] = GeminiBackend(model, os.getenv("GEMINI_API_KEY"))
+            else:
+                api_key = os.getenv("OPENAI_API_KEY") if name == "openai" else None
+                _backends[key] = OpenAICompatibleBackend(model, base_url, api_key, defaults["rpm"], name=name)
+        return _backends[key]
@@ -0,0 +1,87 @@
+import sqlite3
+import hashlib
+import json
+import threading
+import time
+import Metrics
+
+# Content-addressed cache of model output. Keys are hashes of everything that shapes the
+# answer (model, prompt template, constraints, article content), so a hit is always safe to
+# reuse, and identical work done by different briefings is shared. Entries expire after
+# `ttl_days` and the least recently used ones are dropped once the cache passes `max_mb`.
+
+CACHE_FILE = "llm_cache.db"
+CACHE_TTL_DAYS = 30
+CACHE_MAX_MB = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key       TEXT PRIMARY KEY,
+    kind      TEXT NOT NULL,
+    value     TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    created   REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used);
+"""
+
+def make_key(*parts):
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+def article_fingerprint(item):
+    # Identity plus content: an article whose text changed gets a fresh digest
+    return make_key(item.get("guid", ""), item.get("title", ""), item.get("description", ""))
+
+class LLMCache:
+    def __init__(self, path=CACHE_FILE, ttl_days=CACHE_TTL_DAYS, max_mb=CACHE_MAX_MB):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+        self.evict()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute("SELECT value, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or now - row[1] > self.ttl:
+            self.misses += 1
+            Metrics.count("llm_cache_misses")
+            return None
+        with conn:
+            conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        Metrics.count("llm_cache_hits")
+        return row[0]
+
+    def put(self, key, value, kind="response"):
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO llm_cache (key, kind, value, size, created, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                         (key, kind, value, len(value.encode("utf-8")), now, now))
+
+    def evict(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM llm_cache WHERE created < ?", (time.time() - self.ttl,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            if total <= self.max_bytes: return
+            # Oldest-used first until we're back under the cap
+            for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used").fetchall():
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_bytes: break
@@ -0,0 +1,144 @@
+import time
+import json
+import threading
+from contextlib import contextmanager
+
+# Pipeline instrumentation: stage timers and counters for this process, plus formatting
+# for the per-feed health that GetNews keeps in feed_cache.json across runs.
+#
+#   with Metrics.timer("filter"): ...        # count, total and max seconds per stage
+#   Metrics.count("bytes_downloaded", n)
+#
+# Reports come out as text (--stats), JSON (--stats json) or Prometheus text format
+# (--stats prometheus, or GET /metrics on the daemon).
+
+SLOW_SECONDS = 5.0      # A feed averaging longer than this to download is flagged slow
+FAILING_STREAK = 3      # Consecutive failed fetches before a feed is flagged failing
+
+_lock = threading.Lock()
+_counters = {}
+_timers = {}            # stage -> [calls, total seconds, max seconds]
+
+def count(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def observe(stage, seconds):
+    with _lock:
+        t = _timers.setdefault(stage, [0, 0.0, 0.0])
+        t[0] += 1; t[1] += seconds; t[2] = max(t[2], seconds)
+
+@contextmanager
+def timer(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+def snapshot():
+    with _lock:
+        return {"counters": dict(_counters),
+                "timers": {stage: {"calls": t[0], "seconds": round(t[1], 4), "max": round(t[2], 4)}
+                           for stage, t in _timers.items()}}
+
+def reset():
+    with _lock:
+        _counters.clear(); _timers.clear()
+
+# ------------------------------------------------------------------------------
+# Feed health
+# ------------------------------------------------------------------------------
+
+def feed_health(feed_config, feed_cache):
+    # One row per configured feed from its feed_cache.json record, worst first
+    rows = []
+    for f in feed_config:
+        record = feed_cache.get(f['url'], {})
+        h = dict(record.get("health", {}))
+        flags = []
+        if h.get("error_streak", 0) >= FAILING_STREAK: flags.append("failing")
+        if h.get("avg_seconds", 0) > SLOW_SECONDS: flags.append("slow")
+        if h.get("entries") == 0 and not h.get("error_streak"): flags.append("empty")
+        h.update({"name": f['name'], "url": f['url'], "flags": flags})
+        if "interval" in record: h["interval"] = record["interval"]
+        rows.append(h)
+    rows.sort(key=lambda h: (-h.get("error_streak", 0), -h.get("avg_seconds", 0)))
+    return rows
+
+# ------------------------------------------------------------------------------
+# Output
+# ------------------------------------------------------------------------------
+
+def to_json(snap, feeds):
+    return json.dumps({"pipeline": snap, "feeds": feeds}, indent=1)
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+def to_prometheus(snap, feeds):
+    lines = []
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP newsdesk_{name} {help_text}")
+        lines.append(f"# TYPE newsdesk_{name} {kind}")
+        for labels, value in samples:
+            label_str = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+            lines.append(f"newsdesk_{name}{{{label_str}}} {value}" if label_str else f"newsdesk_{name} {value}")
+
+    timers = snap["timers"]
+    metric("stage_seconds_total", "counter", "Time spent per pipeline stage",
+           [({"stage": s}, t["seconds"]) for s, t in sorted(timers.items())])
+    metric("stage_calls_total", "counter", "Times each pipeline stage ran",
+           [({"stage": s}, t["calls"]) for s, t in sorted(timers.items())])
+    metric("stage_seconds_max", "gauge", "Slowest single run of each stage",
+           [({"stage": s}, t["max"]) for s, t in sorted(timers.items())])
+    for name, value in sorted(snap["counters"].items()):
+        metric(f"{name}_total", "counter", name.replace("_", " "), [({}, value)])
+
+    for key, kind, help_text in (("avg_seconds", "gauge", "Smoothed feed download time"),
+                                 ("last_seconds", "gauge", "Last feed download time"),
+                                 ("bytes", "gauge", "Size of the last feed download"),
+                                 ("entries", "gauge", "Entries in the last parsed feed"),
+                                 ("fetches", "counter", "Feed fetch attempts"),
+                                 ("failures", "counter", "Failed feed fetches"),
+                                 ("error_streak", "gauge", "Consecutive failed fetches")):
+        samples = [({"feed": h["name"]}, h[key]) for h in feeds if key in h]
+        if samples: metric(f"feed_{key}", kind, help_text, samples)
+    return "\n".join(lines) + "\n"
+
+def to_text(snap, feeds):
+    lines = []
+    if snap["timers"] or snap["counters"]:
+        lines.append("Pipeline (this run):")
+        for stage, t in sorted(snap["timers"].items(), key=lambda kv: -kv[1]["seconds"]):
+            lines.append(f"  {stage:<16} {t['seconds']:9.3f}s  {t['calls']:6d} calls  max {t['max']:.3f}s")
+        for name, value in sorted(snap["counters"].items()):
+            lines.append(f"  {name:<24} {value}")
+        lines.append("")
+    lines.append(f"Feeds ({len(feeds)}), worst first:")
+    lines.append(f"  {'feed':<28} {'avg s':>7} {'fails':>6} {'streak':>6} {'entries':>7} {'KB':>7}  notes")
+    for h in feeds:
+        notes = " ".join(h["flags"])
+        if h.get("last_error") and h.get("error_streak"): notes += f" ({h['last_error'][:60]})"
+        lines.append(f"  {h['name'][:28]:<28} {h.get('avg_seconds', 0):7.2f} {h.get('failures', 0):6d} "
+                     f"{h.get('error_streak', 0):6d} {h.get('entries', 0):7d} {h.get('bytes', 0) / 1024:7.0f}  {notes.strip()}")
+    return "\n".join(lines)
+
+# ------------------------------------------------------------------------------
+# Profiling
+# ------------------------------------------------------------------------------
+
+@contextmanager
+def profile(path, top=20):
+    # cProfile the block, save the raw stats to `path` (open with pstats or snakeviz) and
+    # print the top functions by cumulative time
+    import cProfile, pstats
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"Profile saved to {path}; top {top} by cumulative time:")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
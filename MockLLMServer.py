@@ -0,0 +1,110 @@
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for an OpenAI/Ollama-style /v1/chat/completions server, for trying the
+# openai/ollama backends and timing the briefing pipeline without a real model.
+# It answers digest prompts with one block per article id (so map-reduce works end to end),
+# everything else with a short canned briefing. --latency and --rpm simulate a slow or
+# rate-limited provider (requests over the limit get 429 + Retry-After). Statuses queued in
+# server.errors answer the next requests instead (a 429 also carries Retry-After: 1), for
+# testing the backends' retries.
+#
+#   python MockLLMServer.py --port 8089 --latency 0.5 --rpm 15
+#   python NewsDesk.py --backend openai --base-url http://127.0.0.1:8089 --output test.md
+
+_DIGEST_ID = re.compile(r"^###\s*(\S+)\s*$", re.MULTILINE)
+
+def mock_reply(prompt):
+    ids = _DIGEST_ID.findall(prompt)
+    if ids:
+        return "".join(f"### {i}\nMock digest for article {i}.\n\n" for i in ids)
+    articles = prompt.count("\nTitle: ") + prompt.startswith("Title: ")
+    return f"## Mock Briefing\n* **{articles}** items reviewed.\n* Prompt was {len(prompt)} characters.\n"
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, so clients can reuse connections
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with server.lock:
+            server.requests += 1
+            now = time.monotonic()
+            while server.recent and now - server.recent[0] >= 60:
+                server.recent.popleft()
+            limited = server.rpm and len(server.recent) >= server.rpm
+            if not limited: server.recent.append(now)
+            error = server.errors.popleft() if server.errors else None
+        if error is not None:
+            self._send(error, {"error": {"message": f"HTTP {error} (mock)"}}, {"Retry-After": "1"} if error == 429 else None)
+            return
+        if limited:
+            self._send(429, {"error": {"message": "rate limited (mock)"}}, {"Retry-After": "1"})
+            return
+        if server.latency: time.sleep(server.latency)
+
+        prompt = "".join(m.get("content", "") for m in body.get("messages", []))
+        reply = mock_reply(prompt)
+        model = body.get("model", "mock")
+        if not body.get("stream"):
+            self._send(200, {"object": "chat.completion", "model": model,
+                             "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}]})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for piece in re.findall(r"\S+\s*", reply) + [None]:
+            if piece is None:
+                data = "[DONE]"
+            else:
+                data = json.dumps({"object": "chat.completion.chunk", "model": model,
+                                   "choices": [{"index": 0, "delta": {"content": piece}}]})
+            chunk = f"data: {data}\n\n".encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items(): self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def start_mock_server(port=0, latency=0.0, rpm=0):
+    # Starts on a background thread; returns (server, base_url). Call server.shutdown() when done.
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.rpm = rpm
+    server.requests = 0
+    server.recent = deque()
+    server.errors = deque()
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock OpenAI/Ollama chat completions server")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute before answering 429 (0 = no limit)")
+    args = parser.parse_args()
+    server, url = start_mock_server(args.port, args.latency, args.rpm)
+    print(f"Mock LLM server on {url}/v1/chat/completions (Ctrl+C to stop)")
+    try:
+        while True: time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
@@ -0,0 +1,267 @@
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import CancelledError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from NewsDaemonClient import DAEMON_URL
+
+# Resident News Desk service. It keeps the article store, feed map and AI backend warm,
+# refreshes each feed on its own schedule, and answers a small JSON API on localhost so the
+# GUI and CLI can skip fetching and loading entirely:
+#
+#   GET  /status                                     last fetch, article counts, feed schedule
+#   GET  /articles?days=1&topic=Tech&search=&archive=0   same results as filter_entries()
+#                  (&hours=6 for a window in hours, &sort=published for publication time)
+#   GET  /topics?days=1&archive=0                    {topic: articles in the window}, as topic_counts()
+#   GET  /metrics?format=prometheus                  stage timings and feed health (or text / json)
+#   POST /fetch                                      refresh every feed now, returns the summary
+#   POST /briefing  {"articles": [...], "topic", "search", "dedup", "enrich", "token_budget",
+#                    "no_cache", "model", "previous"}
+#        ("previous": an earlier report to fold the articles into). Briefings always use the
+#        backend and server URL given on the daemon's command line, so a request can never
+#        send an API key somewhere else.
+#        streams newline-delimited JSON: {"text": chunk} as the briefing arrives, blank
+#        {} heartbeats while the model works, then {"report": ...} or {"error": ...}
+#
+#   python NewsDaemon.py --port 8765
+#
+# POSTs must be application/json and carry no Origin header. Browsers add one to every
+# cross-site POST, so a web page can't make the daemon fetch or spend model calls.
+#
+# NewsDesk.py uses a daemon automatically when one answers on DAEMON_URL (or $NEWSDESK_DAEMON),
+# through NewsDaemonClient.py.
+#
+# Scheduling: each feed is checked every `interval` seconds, aiming for about TARGET_NEW new
+# articles per check. The interval follows a smoothed estimate of the feed's posting rate,
+# so busy wire feeds are polled often and quiet blogs rarely. Failing feeds back off.
+
+MIN_INTERVAL = 15 * 60      # Never poll one feed more often than this
+MAX_INTERVAL = 6 * 3600     # ...or less often than this
+DEFAULT_INTERVAL = 3600     # Until we've seen how fast a feed posts
+TARGET_NEW = 5              # New articles we'd like to find per check
+RATE_SMOOTHING = 0.3        # Weight an hour of observation gets in the posting-rate average
+TICK = 30                   # Seconds between looks at the schedule
+HEARTBEAT = 1.0             # Seconds between keep-alive lines on a streaming response
+
+# ==============================================================================
+# SCHEDULER
+# ==============================================================================
+
+def update_schedule(record, new_count, failed, now):
+    # Updates one feed's feed_cache.json record after a check: rate is new articles per hour
+    interval = record.get("interval", DEFAULT_INTERVAL)
+    checked = record.get("checked")
+    if failed:
+        interval = min(MAX_INTERVAL, interval * 2)
+    elif checked and now > checked:
+        hours = (now - checked) / 3600
+        observed = new_count / hours
+        rate = record.get("rate")
+        if rate is None:
+            # The first check only tells us the feed's backlog; the second starts the estimate
+            if hours * 3600 >= MIN_INTERVAL: rate = observed
+        else:
+            # Weighted by how long we watched, so an early manual refresh barely moves it
+            rate += (1 - (1 - RATE_SMOOTHING) ** hours) * (observed - rate)
+        if rate is not None:
+            record["rate"] = round(rate, 4)
+            interval = TARGET_NEW / rate * 3600 if rate > 0 else MAX_INTERVAL
+    record["interval"] = int(min(MAX_INTERVAL, max(MIN_INTERVAL, interval)))
+    record["checked"] = now
+    record["next_fetch"] = now + record["interval"]
+
+class FeedScheduler:
+    def __init__(self):
+        self.lock = threading.Lock() # One fetch round at a time, scheduled or requested
+        self.stop_event = threading.Event()
+        self.wake = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set(); self.wake.set()
+        self.thread.join(timeout=30)
+
+    def due_feeds(self, now=None):
+        import GetNews
+        now = time.time() if now is None else now
+        cache = GetNews.load_feed_cache()
+        return [f['url'] for f in GetNews.load_feed_config() if cache.get(f['url'], {}).get("next_fetch", 0) <= now]
+
+    def fetch(self, only=None):
+        # Fetches the given feed URLs (all when None) and reschedules them
+        import GetNews
+        def reschedule(cache, new_by_feed, failed):
+            # Runs inside the fetch, under fetch_lock, so no other fetch can save over the new intervals
+            now = time.time()
+            for url in set(new_by_feed) | set(failed):
+                update_schedule(cache.setdefault(url, {}), new_by_feed.get(url, 0), url in failed, now)
+        with self.lock:
+            return GetNews.process_feeds_logic(cancel=self.stop_event, only=only, on_checked=reschedule)
+
+    def schedule(self):
+        import GetNews
+        cache = GetNews.load_feed_cache()
+        return [{"name": f['name'], "url": f['url'], "interval": cache.get(f['url'], {}).get("interval"),
+                 "rate_per_hour": cache.get(f['url'], {}).get("rate"), "next_fetch": cache.get(f['url'], {}).get("next_fetch")}
+                for f in GetNews.load_feed_config()]
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                due = self.due_feeds()
+                if due:
+                    print(f"{len(due)} feeds due")
+                    self.fetch(set(due))
+            except Exception as e:
+                print(f"Scheduled fetch failed: {e}")
+            self.wake.wait(TICK)
+            self.wake.clear()
+
+# ==============================================================================
+# HTTP API
+# ==============================================================================
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        import NewsDesk, GetNews
+        url = urlparse(self.path)
+        args = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if url.path == "/status":
+                store = GetNews.get_store()
+                self._send(200, {"last_fetch": GetNews.last_fetch_time(), "live": store.count(False),
+                                 "archived": store.count(True), "feeds": self.server.scheduler.schedule()})
+            elif url.path == "/articles":
+                articles = NewsDesk.filter_entries(int(args.get("days", 1)), args.get("topic"), args.get("search", ""),
+                                                   args.get("archive") == "1", float(args["hours"]) if args.get("hours") else None,
+                                                   args.get("sort") or "downloaded")
+                self._send(200, articles)
+            elif url.path == "/topics":
+                self._send(200, NewsDesk.topic_counts(int(args.get("days", 1)), args.get("archive") == "1",
+                                                      float(args["hours"]) if args.get("hours") else None,
+                                                      args.get("sort") or "downloaded"))
+            elif url.path == "/metrics":
+                fmt = args.get("format", "prometheus")
+                if fmt not in ("text", "json", "prometheus"): fmt = "prometheus"
+                data = NewsDesk.stats_report(fmt).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json" if fmt == "json" else "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            else:
+                self._send(404, {"error": f"Unknown path {url.path}"})
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+
+    def do_POST(self):
+        if self.headers.get("Origin") is not None:
+            self._send(403, {"error": "Cross-origin requests are not accepted"})
+            return
+        if self.headers.get_content_type() != "application/json":
+            self._send(415, {"error": "Content-Type must be application/json"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not isinstance(body, dict): raise ValueError("expected a JSON object")
+        except ValueError as e:
+            self._send(400, {"error": f"Bad request body: {e}"})
+            return
+        if self.path == "/fetch":
+            try: self._send(200, self.server.scheduler.fetch())
+            except Exception as e: self._send(500, {"error": str(e)})
+        elif self.path == "/briefing":
+            self._briefing(body)
+        else:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+
+    def _briefing(self, body):
+        import NewsDesk, LLMBackends
+        try:
+            backend = LLMBackends.get_backend(self.server.backend_args[0], body.get("model") or self.server.backend_args[1],
+                                              self.server.backend_args[2])
+        except LLMBackends.BackendError as e:
+            self._send(200, {"report": f"Error: {e}"})
+            return
+
+        messages = queue.Queue()
+        cancel = threading.Event()
+        def work():
+            try:
+                report = NewsDesk.run_ai_analysis(body.get("articles", []), body.get("topic"), body.get("search"),
+                                                  on_text=lambda text: messages.put({"text": text}), cancel=cancel,
+                                                  token_budget=int(body.get("token_budget") or 0) or None,
+                                                  use_cache=not body.get("no_cache"), backend=backend,
+                                                  dedup=bool(body.get("dedup")), enrich=bool(body.get("enrich")),
+                                                  previous_report=body.get("previous"))
+                messages.put({"report": report, "backend": backend.summary()})
+            except CancelledError:
+                messages.put({"error": "cancelled"})
+            except Exception as e:
+                messages.put({"error": str(e)})
+        threading.Thread(target=work, daemon=True).start()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            while True:
+                try: message = messages.get(timeout=HEARTBEAT)
+                except queue.Empty: message = {} # Also how we notice a client that went away
+                line = (json.dumps(message) + "\n").encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                self.wfile.flush()
+                if "report" in message or "error" in message: break
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            cancel.set() # Client closed the connection: stop spending model calls on it
+            self.close_connection = True
+
+    def _send(self, status, payload):
+        data = json.dumps(payload, default=dict).encode("utf-8") # default: ArticleStore.Article rows
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def serve(port=8765, backend=None, model=None, base_url=None):
+    scheduler = FeedScheduler()
+    # Only ever bound to localhost: the API has no authentication
+    server = ThreadingHTTPServer(("127.0.0.1", port), DaemonHandler)
+    server.daemon_threads = True
+    server.scheduler = scheduler
+    server.backend_args = (backend, model, base_url)
+    scheduler.start()
+    print(f"News Desk daemon on http://127.0.0.1:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        scheduler.stop()
+
+if __name__ == "__main__":
+    import LLMBackends
+    parser = argparse.ArgumentParser(description="News Desk daemon: scheduled feed refresh and a local JSON API")
+    parser.add_argument("--port", type=int, default=urlparse(DAEMON_URL).port)
+    parser.add_argument("--backend", choices=sorted(LLMBackends.DEFAULTS), help="Default AI backend for briefings")
+    parser.add_argument("--model", help="Model name for the backend")
+    parser.add_argument("--base-url", help="Server URL for the openai/ollama backends")
+    args = parser.parse_args()
+    serve(args.port, args.backend, args.model, args.base_url)
+    sys.exit(0)
@@ -0,0 +1,95 @@
+import os
+import json
+import socket
+from urllib.parse import urlparse, urlencode
+from concurrent.futures import CancelledError
+
+# Client side of NewsDaemon.py, kept separate so the CLI can look for a daemon without
+# loading the server. See NewsDaemon.py for the API.
+
+DAEMON_URL = "http://127.0.0.1:8765"
+
+
+class DaemonClient:
+    # Thin client used by NewsDesk.py; mirrors filter_entries / run_ai_analysis / process_feeds_logic
+    def __init__(self, url=DAEMON_URL):
+        parsed = urlparse(url)
+        self.url = url
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+
+    def _request(self, method, path, body=None, timeout=None):
+        import http.client
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        # default=dict turns ArticleStore.Article records back into plain objects
+        payload = None if body is None else json.dumps(body, default=dict).encode("utf-8")
+        conn.request(method, path, body=payload, headers={"Content-Type": "application/json"})
+        return conn, conn.getresponse()
+
+    def _json(self, method, path, body=None, timeout=None):
+        conn, resp = self._request(method, path, body, timeout)
+        try:
+            data = json.loads(resp.read())
+        finally:
+            conn.close()
+        if resp.status != 200: raise RuntimeError(data.get("error", f"HTTP {resp.status}"))
+        return data
+
+    def status(self, timeout=None):
+        return self._json("GET", "/status", timeout=timeout)
+
+    def articles(self, days, topic, search_term, include_archive=False, hours=None, by="downloaded"):
+        query = urlencode({"days": days, "topic": topic or "", "search": search_term or "", "archive": int(include_archive),
+                           "hours": hours or "", "sort": by})
+        return self._json("GET", "/articles?" + query)
+
+    def topics(self, days, include_archive=False, hours=None, by="downloaded"):
+        query = urlencode({"days": days, "archive": int(include_archive), "hours": hours or "", "sort": by})
+        return self._json("GET", "/topics?" + query)
+
+    def metrics(self, fmt="text"):
+        conn, resp = self._request("GET", "/metrics?" + urlencode({"format": fmt}))
+        try: return resp.read().decode("utf-8")
+        finally: conn.close()
+
+    def fetch(self):
+        return self._json("POST", "/fetch")
+
+    def briefing(self, articles, topic_constraint=None, search_constraint=None, on_text=None, cancel=None,
+                 token_budget=None, use_cache=True, dedup=False, model=None, enrich=False,
+                 previous_report=None):
+        # Returns (report, backend summary). Setting `cancel` drops the connection, which stops the daemon's work.
+        # The daemon briefs with its own backend; `model` only picks the model on it.
+        body = {"articles": articles, "topic": topic_constraint, "search": search_constraint, "dedup": dedup,
+                "enrich": enrich, "previous": previous_report, "token_budget": token_budget, "no_cache": not use_cache,
+                "model": model}
+        conn, resp = self._request("POST", "/briefing", body)
+        try:
+            while True:
+                if cancel is not None and cancel.is_set(): raise CancelledError()
+                line = resp.readline()
+                if not line: raise RuntimeError("Daemon closed the connection")
+                message = json.loads(line)
+                if "text" in message and on_text is not None: on_text(message["text"])
+                if "report" in message: return message["report"], message.get("backend", "")
+                if "error" in message:
+                    if message["error"] == "cancelled": raise CancelledError()
+                    raise RuntimeError(message["error"])
+        finally:
+            conn.close()
+
+def connect(url=None, timeout=0.5):
+    # Returns a DaemonClient if a daemon answers at `url` (default $NEWSDESK_DAEMON or DAEMON_URL), else None
+    client = DaemonClient(url or os.getenv("NEWSDESK_DAEMON") or DAEMON_URL)
+    try:
+        # A bare connect first: with no daemon running this fails at once, before importing http.client
+        socket.create_connection((client.host, client.port), timeout=timeout).close()
+    except (OSError, ValueError):
+        return None
+    import http.client
+    try:
+        client.status(timeout=timeout)
+    except (OSError, ValueError, RuntimeError, http.client.HTTPException):
+        # Some other service on the port (BadStatusLine etc.) isn't a daemon either
+        return None
+    return client
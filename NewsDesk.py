@@ -1,499 +1,428 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext, filedialog
 import json
 import os
 import sys
 import argparse
 import time
-import webbrowser
-import re
+import heapq
+import operator
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-import google.generativeai as genai
 
-# Import the fetcher logic
+# Import the fetcher logic. tkinter (NewsDeskGUI), feedparser and the Gemini SDK are only
+# imported on the paths that use them, so headless runs start quickly (see StartupBench.py).
 import GetNews
+import ArticleStore
+import LLMBackends
+import Metrics
+import TopicIndex
+import NewsDaemonClient
 
 # --- CONFIG ---
 FEEDS_FILE = "feeds.json"
 ENTRIES_FILE = "entries.xml"
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# A NewsDaemonClient.DaemonClient when a daemon is running; filtering, briefings and fetches then go through it
+DAEMON = None
 
 # ==============================================================================
 # CORE LOGIC
 # ==============================================================================
 
-def auto_update_feeds():
+def feeds_need_update():
+    if DAEMON is not None: return False # The daemon keeps every feed on its own schedule
     should_update = False
-    if not os.path.exists(ENTRIES_FILE):
+    last_fetch = GetNews.last_fetch_time()
+    if last_fetch is None:
         should_update = True
     else:
-        mtime = os.path.getmtime(ENTRIES_FILE)
-        age_seconds = time.time() - mtime
+        age_seconds = time.time() - last_fetch
         if age_seconds > 7200: # 2 Hours
             print(f"Data is {int(age_seconds/60)} mins old. Auto-updating...")
             should_update = True
-    
-    if should_update:
+    return should_update
+
+def auto_update_feeds():
+    if feeds_need_update():
         GetNews.process_feeds_logic()
 
-def load_feed_map():
-    feed_map = {}
-    if os.path.exists(FEEDS_FILE):
-        with open(FEEDS_FILE, 'r') as f:
-            data = json.load(f)
-            for item in data:
-                feed_map[item['name']] = item.get('topics', [])
-    return feed_map
-
-def filter_entries(days, topic, search_term):
-    entries = GetNews.load_entries(ENTRIES_FILE)
-    feed_map = load_feed_map()
+def load_topics():
+    # The topic -> sources index for feeds.json; only rebuilt when the file changes
+    return TopicIndex.load(FEEDS_FILE)
+
+def window_start(days, hours=None):
+    # Epoch seconds where a window begins: `hours` back from now, or else midnight `days` days ago
+    if hours: return time.time() - hours * 3600
+    return (datetime.now() - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+def entry_matcher(days, topic, topics, hours=None, by="downloaded"):
+    # Returns a test for one article: downloaded (or published, with by="published") within
+    # the window and from a source matching the topic expression (see TopicIndex.py).
+    # Timestamps are ints set at ingest; the topic is resolved to a set of sources up front.
+    cutoff = window_start(days, hours)
+    timestamp = operator.attrgetter(ArticleStore.TIME_ORDER[by])
+    sources = topics.sources(topic)
+    def matches(data):
+        if timestamp(ArticleStore.Article.from_dict(data)) < cutoff:
+            return False
+        if sources is not None and data.get('source_name', '') not in sources:
+            return False
+        return True
+    return matches
+
+def filter_entries(days, topic, search_term, include_archive=False, hours=None, by="downloaded"):
+    # Articles from the last `days` days (or `hours` hours) of download time, or of publication
+    # time with by="published", newest first. Searches come back best match first.
+    if DAEMON is not None: return DAEMON.articles(days, topic, search_term, include_archive, hours, by)
+    matches = entry_matcher(days, topic, load_topics(), hours, by)
+    since = window_start(days, hours)
     
-    cutoff_date = datetime.now() - timedelta(days=days)
-    entry_list = sorted(entries.values(), key=lambda x: x.get('downloaded', ''), reverse=True)
-    
-    filtered_results = []
+    if search_term:
+        # The full-text index does the matching and returns best matches first
+        entry_list = GetNews.search_entries(search_term, include_archive, since=since, by=by)
+    else:
+        # Only the window is read: an index range scan on the timestamp, already in order
+        entry_list = GetNews.iter_entries(ENTRIES_FILE, since, by)
+        if include_archive:
+            entry_list = heapq.merge(entry_list, GetNews.iter_entries(GetNews.ARCHIVE_FILE, since, by),
+                                     key=operator.attrgetter(ArticleStore.TIME_ORDER[by]), reverse=True)
     
-    for data in entry_list:
-        try:
-            d_str = data.get('downloaded', '')
-            d_obj = datetime.strptime(d_str, "%Y-%m-%d")
-            if d_obj < cutoff_date.replace(hour=0, minute=0, second=0):
-                continue
-        except: continue 
-
-        if topic and topic != "All":
-            source = data.get('source_name', '')
-            source_topics = feed_map.get(source, [])
-            if topic not in source_topics:
-                continue
-        
-        if search_term:
-            t = data.get('title', '').lower()
-            d = data.get('description', '').lower()
-            s = search_term.lower()
-            if s not in t and s not in d:
-                continue
-        
-        filtered_results.append(data)
-        
-    return filtered_results
-
-def run_ai_analysis(articles, topic_constraint=None, search_constraint=None):
-    if not GEMINI_API_KEY:
-        return "Error: GEMINI_API_KEY not set."
+    # The store's articles themselves, not copies
+    with Metrics.timer("filter"):
+        return [data for data in entry_list if matches(data)]
+
+def topic_counts(days, include_archive=False, hours=None, by="downloaded"):
+    # {topic: articles in the window} for every topic in feeds.json, plus "All".
+    # One indexed GROUP BY over the window, then sums over each topic's sources.
+    if DAEMON is not None: return DAEMON.topics(days, include_archive, hours, by)
+    source_counts = GetNews.get_store().count_by_source(None if include_archive else False, window_start(days, hours), by)
+    return load_topics().counts(source_counts)
+
+def run_ai_analysis(articles, topic_constraint=None, search_constraint=None, on_text=None, cancel=None,
+                    token_budget=None, use_cache=True, backend=None, dedup=False, enrich=False,
+                    previous_report=None):
+    # on_text(chunk) receives the briefing as it streams in; cancel is an optional threading.Event.
+    # Selections larger than token_budget (default Briefing.TOKEN_BUDGET) are map-reduced in batches.
+    # Briefings and per-article digests are reused from llm_cache.db unless use_cache is False.
+    # backend defaults to LLMBackends.get_backend() (Gemini unless NEWSDESK_BACKEND says otherwise).
+    # With dedup, near-duplicate articles reach the model as one story listing all their outlets.
+    # With enrich, the model reads each article's full page text instead of the feed's teaser (see Enrich.py).
+    # With previous_report (an earlier report from this function), the articles are folded into it.
+    if DAEMON is not None and backend is None:
+        return DAEMON.briefing(articles, topic_constraint, search_constraint, on_text, cancel,
+                               token_budget, use_cache, dedup, enrich=enrich, previous_report=previous_report)[0]
+    if backend is None:
+        try: backend = LLMBackends.get_backend()
+        except LLMBackends.BackendError as e: return f"Error: {e}"
+    import Briefing, LLMCache # Only a local briefing needs the prompt builder and the cache
     
-    selected_text = ""
     source_links = []
     
     for item in articles:
-        selected_text += f"Title: {item['title']}\nSource: {item.get('source_name')}\nContent: {item['description']}\n\n"
         clean_title = item['title'].replace('[', '(').replace(']', ')')
         link_str = f"* [{clean_title}]({item.get('link')})"
         source_links.append(link_str)
-
-    genai.configure(api_key=GEMINI_API_KEY)
-    
-    context_instruction = ""
-    if topic_constraint and topic_constraint != "All":
-        context_instruction += f"\nSTRICT CONSTRAINT: The user is only interested in the topic: '{topic_constraint}'. DISCARD and IGNORE any information that does not directly pertain to this topic."
-    
-    if search_constraint:
-        context_instruction += f"\nSTRICT CONSTRAINT: The user is only interested in the keyword: '{search_constraint}'. Focus EXCLUSIVELY on insights related to this term. IGNORE unrelated context."
-
-    model = genai.GenerativeModel('gemini-flash-latest') 
-
-    prompt = (
-        "You are an executive news analyst. Create a structured briefing from these articles."
-        f"{context_instruction}\n"
-        "Use Markdown formatting. Use ## for Headlines, ** for bold importance, and * for bullet points. "
-        "Group by theme.\n\n"
-        f"{selected_text}"
-    )
-    
-    response = model.generate_content(prompt)
-    final_report = response.text + "\n\n## Sources Reviewed\n" + "\n".join(source_links)
+    previous_body, previous_links = split_report(previous_report)
+    source_links += [link for link in previous_links if link not in source_links]
+    source_links = source_links[:MAX_SOURCES_KEPT]
+
+    def generate(prompt, on_text=None):
+        return backend.generate(prompt, on_text, cancel)
+
+    if enrich:
+        import Enrich # html.parser and the page cache are only needed here
+        articles = Enrich.enrich(articles, cancel=cancel)
+
+    stories = articles
+    if dedup:
+        import Dedup
+        with Metrics.timer("dedup"): stories = Dedup.collapse(articles)
+        print(f"Collapsed {len(articles)} articles into {len(stories)} stories")
+
+    cache = LLMCache.LLMCache() if use_cache else None
+    with Metrics.timer("synthesize"):
+        body = Briefing.synthesize(stories, generate, topic_constraint, search_constraint,
+                                   token_budget=token_budget or Briefing.TOKEN_BUDGET, on_text=on_text, cancel=cancel,
+                                   cache=cache, model_name=backend.label, previous=previous_body)
+    final_report = body + SOURCES_HEADING + "\n".join(source_links)
     return final_report
 
+def split_report(report):
+    # (briefing body, source link lines) of a report from run_ai_analysis
+    if not report: return None, []
+    body, _, sources = report.partition(SOURCES_HEADING)
+    return body, [line for line in sources.splitlines() if line.startswith("* [")]
+
 # ==============================================================================
-# GUI CLASSES
+# INCREMENTAL BRIEFINGS
 # ==============================================================================
 
-class FeedManagerDialog(tk.Toplevel):
-    def __init__(self, parent, callback_refresh):
-        super().__init__(parent)
-        self.title("Manage Feeds")
-        self.geometry("500x450")
-        self.callback_refresh = callback_refresh
-        self.feeds = []
-        
-        self.listbox = tk.Listbox(self, height=10)
-        self.listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        frame = ttk.Frame(self)
-        frame.pack(fill=tk.X, padx=10, pady=5)
-        
-        ttk.Label(frame, text="Name:").grid(row=0, column=0, sticky="w")
-        self.entry_name = ttk.Entry(frame)
-        self.entry_name.grid(row=0, column=1, sticky="ew", padx=5)
-        ttk.Label(frame, text="URL:").grid(row=1, column=0, sticky="w")
-        self.entry_url = ttk.Entry(frame)
-        self.entry_url.grid(row=1, column=1, sticky="ew", padx=5)
-        ttk.Label(frame, text="Topics (csv):").grid(row=2, column=0, sticky="w")
-        self.entry_topics = ttk.Entry(frame)
-        self.entry_topics.grid(row=2, column=1, sticky="ew", padx=5)
-        frame.columnconfigure(1, weight=1)
-
-        btn_frame = ttk.Frame(self)
-        btn_frame.pack(fill=tk.X, padx=10, pady=10)
-        ttk.Button(btn_frame, text="Add", command=self.add_feed).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="Delete", command=self.delete_feed).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="Close", command=self.destroy).pack(side=tk.RIGHT, padx=5)
-        self.load_feeds()
-
-    def load_feeds(self):
-        self.listbox.delete(0, tk.END)
-        if os.path.exists(FEEDS_FILE):
-            with open(FEEDS_FILE, 'r') as f:
-                self.feeds = json.load(f)
-                for feed in self.feeds:
-                    self.listbox.insert(tk.END, f"{feed['name']} - {', '.join(feed['topics'])}")
-
-    def add_feed(self):
-        name = self.entry_name.get()
-        url = self.entry_url.get()
-        topics = [t.strip() for t in self.entry_topics.get().split(",") if t.strip()]
-        if name and url:
-            new_feed = {"name": name, "url": url, "topics": topics, "date_added": datetime.now().strftime("%Y-%m-%d")}
-            self.feeds.append(new_feed)
-            self.save_feeds()
-            self.load_feeds()
-            self.callback_refresh() 
-            self.entry_name.delete(0, tk.END); self.entry_url.delete(0, tk.END); self.entry_topics.delete(0, tk.END)
-
-    def delete_feed(self):
-        sel = self.listbox.curselection()
-        if sel:
-            del self.feeds[sel[0]]
-            self.save_feeds()
-            self.load_feeds()
-            self.callback_refresh()
-
-    def save_feeds(self):
-        with open(FEEDS_FILE, 'w') as f: json.dump(self.feeds, f, indent=4)
-
-class NewsApp:
-    def __init__(self, root, default_days=1, default_topic="All", default_search=""):
-        self.root = root
-        self.root.title("Python News Desk v3.2")
-        self.root.geometry("1100x850")
-        self.check_vars = {} 
-        
-        self.init_days = default_days
-        self.init_topic = default_topic
-        self.init_search = default_search
-        
-        self._setup_ui()
-        self._load_config()
-        
-        if self.init_search: self.entry_search.insert(0, self.init_search)
-        self.spin_days.set(self.init_days)
-        
-        # We need to wait a ms for the window to draw so we can get the width for the cards
-        self.root.after(100, self.apply_filters)
-
-    def _setup_ui(self):
-        toolbar = ttk.Frame(self.root, padding=5)
-        toolbar.pack(fill=tk.X)
-        ttk.Button(toolbar, text="🔄 Fetch New Articles", command=self.fetch_news).pack(side=tk.LEFT, padx=5)
-        ttk.Button(toolbar, text="⚙️ Manage Feeds", command=self.open_manager).pack(side=tk.LEFT, padx=5)
-        ttk.Button(toolbar, text="❓ Help", command=self.show_help).pack(side=tk.LEFT, padx=5)
-        
-        filter_bar = ttk.LabelFrame(self.root, text="Filters & Search", padding=5)
-        filter_bar.pack(fill=tk.X, padx=10, pady=5)
-        
-        ttk.Label(filter_bar, text="Age (Days):").pack(side=tk.LEFT, padx=5)
-        self.spin_days = ttk.Spinbox(filter_bar, from_=1, to=30, width=5, command=self.apply_filters)
-        self.spin_days.pack(side=tk.LEFT, padx=5)
-        
-        ttk.Label(filter_bar, text="Topic:").pack(side=tk.LEFT, padx=5)
-        self.combo_topic = ttk.Combobox(filter_bar, state="readonly", width=15)
-        self.combo_topic.pack(side=tk.LEFT, padx=5)
-        self.combo_topic.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
-        
-        ttk.Label(filter_bar, text="Search:").pack(side=tk.LEFT, padx=(15, 5))
-        self.entry_search = ttk.Entry(filter_bar, width=30)
-        self.entry_search.pack(side=tk.LEFT, padx=5)
-        self.entry_search.bind("<Return>", lambda e: self.apply_filters())
-
-        # --- SCROLLABLE CONTAINER ---
-        list_container = ttk.Frame(self.root)
-        list_container.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=5)
-
-        self.scrollbar = ttk.Scrollbar(list_container, orient="vertical")
-        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.news_list = tk.Canvas(list_container, bg="#f0f0f0", yscrollcommand=self.scrollbar.set)
-        self.news_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.scrollbar.config(command=self.news_list.yview)
-        
-        self.news_frame = tk.Frame(self.news_list, bg="#f0f0f0")
-        self.news_list.create_window((0, 0), window=self.news_frame, anchor="nw")
-        
-        def update_scrollregion(e):
-            self.news_list.configure(scrollregion=self.news_list.bbox("all"))
-        self.news_frame.bind("<Configure>", update_scrollregion)
-        
-        # Bind scroll to canvas
-        def canvas_scroll_wheel(e):
-            # SCROLL SPEED TUNING: Adjust the multiplier below (currently 30)
-            if abs(e.delta) < 5:  # Linux/some systems use small deltas
-                delta = -e.delta * 30
-            else:  # Windows/Mac use larger deltas
-                delta = int(-1*(e.delta/120)) * 10
-            self.news_list.yview_scroll(delta, "units")
-        def canvas_scroll_up(e):
-            self.news_list.yview_scroll(-30, "units")  # SCROLL SPEED TUNING: Adjust this value
-        def canvas_scroll_down(e):
-            self.news_list.yview_scroll(30, "units")  # SCROLL SPEED TUNING: Adjust this value
-        
-        self.news_list.bind("<MouseWheel>", canvas_scroll_wheel)
-        self.news_list.bind("<Button-4>", canvas_scroll_up)
-        self.news_list.bind("<Button-5>", canvas_scroll_down)
-
-        # --- ACTION BAR ---
-        action_bar = ttk.Frame(self.root, padding=10)
-        action_bar.pack(fill=tk.X, side=tk.BOTTOM)
-        
-        ttk.Button(action_bar, text="Select All", command=lambda: self.set_all_checks(True)).pack(side=tk.LEFT, padx=5)
-        ttk.Button(action_bar, text="Select None", command=lambda: self.set_all_checks(False)).pack(side=tk.LEFT, padx=5)
-        ttk.Button(action_bar, text="Invert Selection", command=self.invert_checks).pack(side=tk.LEFT, padx=5)
-        
-        self.btn_summarize = ttk.Button(action_bar, text="🤖 Generate AI Briefing (Selected)", command=self.generate_summary_gui)
-        self.btn_summarize.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=20, ipady=5)
-
-    def _load_config(self):
-        topics = set(["All"])
-        feed_map = load_feed_map()
-        for t_list in feed_map.values():
-            for t in t_list: topics.add(t)
-        
-        sorted_topics = sorted(list(topics))
-        self.combo_topic['values'] = sorted_topics
-        
-        if self.init_topic and self.init_topic in sorted_topics:
-            self.combo_topic.set(self.init_topic)
-        else:
-            self.combo_topic.current(0)
-
-    def open_manager(self): FeedManagerDialog(self.root, self._load_config)
+# A briefing profile remembers how far its last successful briefing got, so a cron job only
+# briefs what arrived since (--since-last NAME, or "since_last" in a jobs file). The watermark
+# is the newest download time briefed plus the guids downloaded in that second. It is kept in
+# newsdesk.db with the last report and replaced in one write after the new report is saved;
+# a failed or killed run leaves it alone, so the next run picks up the same articles.
+# Profiles go by download time, so articles published late still count as new. The days/hours
+# window still applies: a profile never reaches further back than that (all a first run gets).
+
+PROFILE_KEY = "briefing:"
+SOURCES_HEADING = "\n\n## Sources Reviewed\n"
+MAX_SOURCES_KEPT = 300  # Merged reports keep this many source links, newest first
+
+def load_profile(name):
+    value = GetNews.get_store().get_meta(PROFILE_KEY + name)
+    return json.loads(value) if value else None
+
+def save_profile(name, profile, articles, report):
+    # Moves the watermark past `articles` and keeps `report` for --merge-previous
+    ts = max(a.get('downloaded_ts', 0) for a in articles)
+    guids = [a['guid'] for a in articles if a.get('downloaded_ts', 0) == ts]
+    if profile is not None and profile["ts"] == ts: guids = profile["guids"] + guids
+    GetNews.get_store().set_meta(PROFILE_KEY + name, json.dumps(
+        {"ts": ts, "guids": guids, "briefed": datetime.now().isoformat(timespec="seconds"),
+         "articles": len(articles), "report": report}))
+
+def profile_hours(profile, days, hours=None):
+    # The window to filter on: from just before the watermark, unless the usual window is shorter
+    if profile is None or profile["ts"] < window_start(days, hours): return hours
+    return (time.time() - profile["ts"] + 60) / 3600
+
+def after_watermark(articles, profile):
+    if profile is None: return articles
+    seen = set(profile["guids"])
+    return [a for a in articles if a.get('downloaded_ts', 0) >= profile["ts"] and a['guid'] not in seen]
 
-    def show_toast(self, message, color="#333333"):
-        toast = tk.Toplevel(self.root); toast.overrideredirect(True)
-        x = self.root.winfo_x() + (self.root.winfo_width() // 2) - 100
-        y = self.root.winfo_y() + (self.root.winfo_height() // 2) - 30
-        toast.geometry(f"200x40+{x}+{y}"); toast.configure(bg=color)
-        tk.Label(toast, text=message, bg=color, fg="white", font=("Arial", 10, "bold")).pack(expand=True, fill=tk.BOTH)
-        self.root.after(1500, toast.destroy)
-
-    def fetch_news(self):
-        GetNews.process_feeds_logic()
-        self.apply_filters()
-        self.show_toast("Feeds Updated")
-
-    def set_all_checks(self, state):
-        for var in self.check_vars.values(): var.set(state)
-
-    def invert_checks(self):
-        for var in self.check_vars.values(): var.set(not var.get())
-
-    def _bind_mousewheel_to_card(self, widget):
-        def scroll_wheel(e):
-            # SCROLL SPEED TUNING: Adjust the multipliers below (currently 30 and 10)
-            if abs(e.delta) < 5:  # Linux/some systems use small deltas
-                delta = -e.delta * 30
-            else:  # Windows/Mac use larger deltas
-                delta = int(-1*(e.delta/120)) * 10
-            self.news_list.yview_scroll(delta, "units")
-            return "break"
-        def scroll_up(e):
-            self.news_list.yview_scroll(-30, "units")  # SCROLL SPEED TUNING: Adjust this value
-            return "break"
-        def scroll_down(e):
-            self.news_list.yview_scroll(30, "units")  # SCROLL SPEED TUNING: Adjust this value
-            return "break"
-        
-        widget.bind("<MouseWheel>", scroll_wheel)
-        widget.bind("<Button-4>", scroll_up)
-        widget.bind("<Button-5>", scroll_down)
-        for child in widget.winfo_children():
-            self._bind_mousewheel_to_card(child)
-
-    def apply_filters(self):
-        for widget in self.news_frame.winfo_children():
-            widget.destroy()
-        self.check_vars = {}
-        
-        try: days = int(self.spin_days.get())
-        except: days = 1
-        
-        filtered_data = filter_entries(days, self.combo_topic.get(), self.entry_search.get().strip())
-
-        # Fixed card width
-        card_width = 1050
-
-        if not filtered_data:
-            lbl = tk.Label(self.news_frame, text="No articles found.", font=("Arial", 12), bg="#f0f0f0", fg="#555")
-            lbl.pack(pady=20)
-        
-        for data in filtered_data:
-            self._render_article_card(data, card_width)
-        
-        # Force scrollregion update after adding all cards
-        self.news_frame.update_idletasks()
-        self.news_list.configure(scrollregion=self.news_list.bbox("all"))
-        self.news_list.yview_moveto(0)
-
-    def _render_article_card(self, data, width_px):
-        guid = data.get('guid')
-        
-        # Card with fixed width
-        card = tk.Frame(self.news_frame, bg="white", bd=1, relief="solid", width=width_px, height=100)
-        card.pack(pady=5, padx=5)
-        card.pack_propagate(False)
-        
-        # Header
-        header = tk.Frame(card, bg="#e0e0e0", height=30)
-        header.pack(fill=tk.X)
-        
-        var = tk.BooleanVar()
-        self.check_vars[guid] = var
-        chk = tk.Checkbutton(header, variable=var, bg="#e0e0e0", activebackground="#e0e0e0")
-        chk.pack(side=tk.LEFT, padx=5)
-        
-        header_text = f"[{data.get('source_name', 'Unknown')}] {data.get('title', 'No Title')}"
-        lbl_head = tk.Label(header, text=header_text, bg="#e0e0e0", fg="black", font=("Arial", 10, "bold"), wraplength=width_px-60, anchor="w", justify="left")
-        lbl_head.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        
-        # Body
-        body = tk.Frame(card, bg="white")
-        body.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        
-        lbl_desc = tk.Label(body, text=data.get('description', '')[:300]+"...", bg="white", fg="#333333", 
-                           justify="left", wraplength=width_px-40, anchor="nw")
-        lbl_desc.pack(anchor="nw", fill=tk.BOTH, expand=True)
-        
-        link = data.get('link', '')
-        lbl_link = tk.Label(body, text="Read Full Article", fg="blue", bg="white", cursor="hand2", font=("Arial", 9, "underline"))
-        lbl_link.pack(anchor="w", pady=(5,0))
-        lbl_link.bind("<Button-1>", lambda e, url=link: webbrowser.open_new(url))
-
-        # Bind scrollwheel to pass through to canvas
-        self._bind_mousewheel_to_card(card)
-
-    def show_help(self):
-        manual = """# Python News Desk Manual\n\n## Auto-Update\nThe app automatically updates feeds if data is > 2 hours old on startup.\n\n## CLI Automation\nYou can generate reports without the GUI:\n`python FeedViewer.py --topic="Tech" --days=1 --output=report.md`"""
-        SummaryWindow(self.root, manual)
-
-    def generate_summary_gui(self):
-        selected_entries = []
-        all_entries = GetNews.load_entries(ENTRIES_FILE)
-        
-        count = 0
-        for guid, var in self.check_vars.items():
-            if var.get():
-                item = all_entries.get(guid)
-                if item: selected_entries.append(item)
-                count += 1
-        
-        if count == 0:
-            self.show_toast("No articles selected", "red")
-            return
+# ==============================================================================
+# BATCH JOBS
+# ==============================================================================
 
-        try:
-            self.root.config(cursor="watch"); self.root.update()
-            report = run_ai_analysis(selected_entries, self.combo_topic.get(), self.entry_search.get().strip())
-            self.root.config(cursor="")
-            SummaryWindow(self.root, report)
-        except Exception as e:
-            self.root.config(cursor="")
-            messagebox.showerror("AI Error", str(e))
-
-class SummaryWindow(tk.Toplevel):
-    def __init__(self, parent, markdown_text, title="AI Briefing"):
-        super().__init__(parent); self.title(title); self.geometry("800x700")
-        self.markdown_text = markdown_text
-        
-        toolbar = ttk.Frame(self); toolbar.pack(fill=tk.X, pady=5)
-        ttk.Button(toolbar, text="Copy", command=self.copy_text).pack(side=tk.LEFT, padx=5)
-        ttk.Button(toolbar, text="Save", command=self.save_text).pack(side=tk.LEFT, padx=5)
-        
-        self.text_area = scrolledtext.ScrolledText(self, font=("Segoe UI", 11), wrap=tk.WORD, padx=20, pady=20)
-        self.text_area.pack(fill=tk.BOTH, expand=True)
-        self._config_tags()
-        self.render_markdown(markdown_text)
-        self.text_area.config(state=tk.DISABLED)
-
-    def _config_tags(self):
-        self.text_area.tag_config("h1", font=("Segoe UI", 18, "bold"), foreground="#2c3e50", spacing3=10)
-        self.text_area.tag_config("h2", font=("Segoe UI", 14, "bold"), foreground="#2980b9", spacing3=5)
-        self.text_area.tag_config("bold", font=("Segoe UI", 11, "bold"))
-        self.text_area.tag_config("bullet", lmargin1=20, lmargin2=30)
-
-    def render_markdown(self, text):
-        lines = text.split('\n')
-        for line in lines:
-            tag = None; clean = line
-            if line.startswith('## '): tag="h2"; clean=line[3:]
-            elif line.startswith('# '): tag="h1"; clean=line[2:]
-            elif line.startswith('* ') or line.startswith('- '): tag="bullet"
-            idx = self.text_area.index(tk.INSERT)
-            self.text_area.insert(tk.END, clean + "\n")
-            if tag: self.text_area.tag_add(tag, idx, f"{idx} lineend")
-            for m in re.finditer(r'\*\*(.*?)\*\*', clean):
-                s = self.text_area.search(m.group(1), idx, stopindex=f"{idx} lineend")
-                if s: self.text_area.tag_add("bold", s, f"{s}+{len(m.group(1))}c")
-
-    def copy_text(self):
-        self.clipboard_clear(); self.clipboard_append(self.markdown_text)
-
-    def save_text(self):
-        f = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text", "*.txt")])
-        if f: 
-            with open(f, 'w', encoding='utf-8') as file: file.write(self.markdown_text)
+# A jobs file is a JSON list of briefings to produce in one run, e.g.
+#   [{"topic": "Tech", "days": 1, "output": "briefs/tech_{date}.md"},
+#    {"search": "quantum computing", "days": 3, "archive": true, "output": "briefs/quantum_{date}.md"}]
+# Keys match the command line options: topic, days, hours, sort, search, archive, dedup, enrich, output (required),
+# plus since_last (a profile name, see INCREMENTAL BRIEFINGS) and merge (like --merge-previous).
+BATCH_WORKERS = 4 # Briefings generated at once; the backend's rate limit still applies
+
+def load_jobs(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    today = datetime.now().strftime("%Y-%m-%d")
+    jobs = []
+    profiles = set()
+    for n, item in enumerate(data, 1):
+        if not item.get('output'):
+            raise ValueError(f"Job {n} in {path} has no output file")
+        if item.get('since_last'):
+            if item['since_last'] in profiles:
+                raise ValueError(f"Job {n} in {path} reuses the profile {item['since_last']!r}")
+            profiles.add(item['since_last'])
+        if item.get('sort', 'downloaded') not in ArticleStore.TIME_ORDER:
+            raise ValueError(f"Job {n} in {path} has an unknown sort {item['sort']!r}")
+        jobs.append({'topic': item.get('topic'), 'days': int(item.get('days', 1)),
+                     'hours': float(item['hours']) if item.get('hours') else None,
+                     'sort': item.get('sort', 'downloaded'), 'search': item.get('search', ''), 'archive': bool(item.get('archive', False)),
+                     'dedup': bool(item.get('dedup', False)), 'enrich': bool(item.get('enrich', False)),
+                     'since_last': item.get('since_last'), 'merge': bool(item.get('merge', False)), 'output': item['output'].replace("{date}", today)})
+    return jobs
+
+def filter_jobs(jobs):
+    # Like filter_entries for every job at once. Searches go through the full-text index,
+    # one query each; every other job is answered from a single pass over the widest window
+    # (one pass per sort order used).
+    topics = load_topics()
+    results = [[] for _ in jobs]
+    scans = {}
+    for i, job in enumerate(jobs):
+        matches = entry_matcher(job['days'], job['topic'], topics, job.get('hours'), job.get('sort', 'downloaded'))
+        if job['search']:
+            found = GetNews.search_entries(job['search'], job['archive'], since=window_start(job['days'], job.get('hours')),
+                                           by=job.get('sort', 'downloaded'))
+            results[i] = [d for d in found if matches(d)]
+        else:
+            scans.setdefault(job.get('sort', 'downloaded'), []).append((results[i], matches, job['archive'], job))
+
+    for by, group in scans.items():
+        since = min(window_start(job['days'], job.get('hours')) for _, _, _, job in group)
+        stream = ((data, False) for data in GetNews.iter_entries(ENTRIES_FILE, since, by))
+        if any(archive for _, _, archive, _ in group):
+            archived = ((data, True) for data in GetNews.iter_entries(GetNews.ARCHIVE_FILE, since, by))
+            timestamp = operator.attrgetter(ArticleStore.TIME_ORDER[by])
+            stream = heapq.merge(stream, archived, key=lambda x: timestamp(x[0]), reverse=True)
+        for data, is_archived in stream:
+            for found, matches, archive, _ in group:
+                if (archive or not is_archived) and matches(data):
+                    found.append(data)
+    return results
+
+def run_batch(jobs, backend, token_budget=None, use_cache=True, workers=BATCH_WORKERS):
+    # Filters every job in one pass, then generates the briefings concurrently.
+    # Returns the number of jobs that failed.
+    start = time.time()
+    profiles = {}
+    for job in jobs:
+        if job['since_last']:
+            profiles[job['since_last']] = profile = load_profile(job['since_last'])
+            job['hours'] = profile_hours(profile, job['days'], job['hours'])
+            job['sort'] = "downloaded"
+    with Metrics.timer("filter"): results = filter_jobs(jobs)
+    results = [after_watermark(found, profiles.get(job['since_last'])) for job, found in zip(jobs, results)]
+    print(f"Filtered {len(jobs)} jobs in {time.time() - start:.2f}s")
+
+    def run(job, articles):
+        profile = profiles.get(job['since_last'])
+        report = run_ai_analysis(articles, job['topic'], job['search'], token_budget=token_budget,
+                                 use_cache=use_cache, backend=backend, dedup=job['dedup'], enrich=job['enrich'],
+                                 previous_report=profile["report"] if profile and job['merge'] else None)
+        if report.startswith("Error:"): raise RuntimeError(report[7:])
+        folder = os.path.dirname(job['output'])
+        if folder: os.makedirs(folder, exist_ok=True)
+        GetNews.atomic_write(job['output'], report)
+        if job['since_last']: save_profile(job['since_last'], profile, articles, report)
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {}
+        for job, articles in zip(jobs, results):
+            print(f"{job['output']}: {len(articles)} matching articles")
+            if articles: futures[pool.submit(run, job, articles)] = job
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                future.result()
+                print(f"Report saved to: {job['output']}")
+            except Exception as e:
+                failed += 1
+                print(f"{job['output']} failed: {e}")
+    print(f"Batch finished in {time.time() - start:.1f}s")
+    return failed
+
+def stats_report(fmt="text"):
+    # Stage timings from this process (or the daemon's) and the feed health kept in feed_cache.json
+    if DAEMON is not None: return DAEMON.metrics(fmt)
+    snap = Metrics.snapshot()
+    feeds = Metrics.feed_health(GetNews.load_feed_config(), GetNews.load_feed_cache())
+    if fmt == "json": return Metrics.to_json(snap, feeds)
+    if fmt == "prometheus": return Metrics.to_prometheus(snap, feeds)
+    return Metrics.to_text(snap, feeds)
 
 # ==============================================================================
 # MAIN ENTRY POINT
 # ==============================================================================
 
-if __name__ == "__main__":
+def main():
     if not os.path.exists(FEEDS_FILE):
         with open(FEEDS_FILE, 'w') as f: json.dump([], f)
 
     parser = argparse.ArgumentParser(description="Python News Desk")
-    parser.add_argument("--topic", help="Filter by topic")
+    parser.add_argument("--topic", help='Filter by topic, or topics: "Tech OR Science", "Tech Business", "Tech -Sports"')
     parser.add_argument("--days", type=int, default=1, help="Age in days")
-    parser.add_argument("--search", default="", help="Grep search term")
+    parser.add_argument("--hours", type=float, help="Age in hours instead of days, e.g. 6")
+    parser.add_argument("--sort", choices=sorted(ArticleStore.TIME_ORDER), default="downloaded",
+                        help="Time the age and order go by: when we downloaded the article (default) or when it was published")
+    parser.add_argument("--search", default="", help='Full-text search: words, "phrases", AND / OR / NOT, prefix*')
+    parser.add_argument("--archive", action="store_true", help="Also search archived articles")
     parser.add_argument("--output", help="Save AI report to file (Headless Mode)")
+    parser.add_argument("--jobs", help="JSON file of briefings to generate in one run (Headless Mode)")
+    parser.add_argument("--since-last", metavar="NAME",
+                        help="Only brief articles downloaded since profile NAME's last briefing (with --output)")
+    parser.add_argument("--merge-previous", action="store_true",
+                        help="With --since-last, fold the new articles into the profile's previous report")
+    parser.add_argument("--token-budget", type=int,
+                        help="Max prompt tokens per AI request; bigger selections are summarized in batches (default 30000)")
+    parser.add_argument("--dedup", action="store_true", help="Merge near-duplicate stories before sending them to the AI")
+    parser.add_argument("--enrich", action="store_true",
+                        help="Download the linked pages and brief from their full text (cached in page_cache.db)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached AI briefings and digests")
+    parser.add_argument("--backend", choices=sorted(LLMBackends.DEFAULTS), help="AI backend (default: gemini, or $NEWSDESK_BACKEND)")
+    parser.add_argument("--model", help="Model name for the backend")
+    parser.add_argument("--base-url", help="Server URL for the openai/ollama backends")
+    parser.add_argument("--daemon", metavar="URL", help=f"Use the News Desk daemon at URL (default: {NewsDaemonClient.DAEMON_URL} if running)")
+    parser.add_argument("--local", action="store_true", help="Work on the local files even if a daemon is running")
+    parser.add_argument("--stats", nargs="?", const="text", choices=["text", "json", "prometheus"],
+                        help="Print stage timings and per-feed health after the run (on its own: just feed health)")
+    parser.add_argument("--profile", metavar="FILE", help="Run under cProfile and save the stats to FILE")
     args = parser.parse_args()
-
-    auto_update_feeds()
-
-    if args.output:
-        print(f"--- Headless Mode Started ---")
-        articles = filter_entries(args.days, args.topic, args.search)
+    if (args.since_last or args.merge_previous) and not args.output:
+        parser.error("--since-last and --merge-previous need --output (in a jobs file, use since_last and merge)")
+    if args.merge_previous and not args.since_last:
+        parser.error("--merge-previous needs --since-last")
+
+    global DAEMON
+    if not args.local:
+        DAEMON = NewsDaemonClient.connect(args.daemon)
+        if DAEMON is None and args.daemon: sys.exit(f"Error: no News Desk daemon at {args.daemon}")
+
+    if args.stats and not (args.output or args.jobs):
+        print(stats_report(args.stats))
+        return
+    try:
+        with (Metrics.profile(args.profile) if args.profile else contextlib.nullcontext()):
+            run(args)
+    finally:
+        if args.stats: print(stats_report(args.stats))
+
+def run(args):
+    if args.jobs:
+        try: jobs = load_jobs(args.jobs)
+        except (OSError, ValueError) as e: sys.exit(f"Error: {e}")
+        auto_update_feeds()
+        print(f"--- Batch Mode: {len(jobs)} jobs ---")
+        try: backend = LLMBackends.get_backend(args.backend, args.model, args.base_url)
+        except LLMBackends.BackendError as e: sys.exit(f"Error: {e}")
+        failed = run_batch(jobs, backend, token_budget=args.token_budget, use_cache=not args.no_cache)
+        print(backend.summary())
+        sys.exit(1 if failed else 0)
+    elif args.output:
+        auto_update_feeds()
+        print("--- Headless Mode Started ---")
+        profile = previous = None
+        if args.since_last:
+            profile = load_profile(args.since_last)
+            if profile is not None:
+                print(f"Profile {args.since_last}: last briefed {profile['briefed']}")
+                if args.merge_previous: previous = profile["report"]
+            articles = after_watermark(filter_entries(args.days, args.topic, args.search, args.archive,
+                                                      profile_hours(profile, args.days, args.hours)), profile)
+        else:
+            articles = filter_entries(args.days, args.topic, args.search, args.archive, args.hours, args.sort)
         print(f"Found {len(articles)} matching articles.")
-        if len(articles) > 0:
-            print("Sending to Gemini...")
-            report = run_ai_analysis(articles, args.topic, args.search)
-            with open(args.output, 'w', encoding='utf-8') as f: f.write(report)
-            print(f"Report saved to: {args.output}")
+        if not articles:
+            print("No new articles since the last briefing." if profile else "No articles found.")
+            return
+        # The daemon briefs with the backend it was started with; asking for another one briefs here
+        if DAEMON is not None and not (args.backend or args.base_url):
+            print(f"Sending to daemon at {DAEMON.url}...")
+            try:
+                report, stats = DAEMON.briefing(articles, args.topic, args.search, token_budget=args.token_budget,
+                                                use_cache=not args.no_cache, dedup=args.dedup, enrich=args.enrich,
+                                                model=args.model, previous_report=previous)
+            except RuntimeError as e: sys.exit(f"Error: {e}")
         else:
-            print("No articles found.")
+            try: backend = LLMBackends.get_backend(args.backend, args.model, args.base_url)
+            except LLMBackends.BackendError as e: sys.exit(f"Error: {e}")
+            print(f"Sending to {backend.label}...")
+            report = run_ai_analysis(articles, args.topic, args.search, token_budget=args.token_budget,
+                                     use_cache=not args.no_cache, backend=backend, dedup=args.dedup, enrich=args.enrich,
+                                     previous_report=previous)
+            stats = backend.summary()
+        failed = report.startswith("Error:")
+        # A running report (--merge-previous) is left as it was rather than replaced by the error
+        if failed and args.merge_previous:
+            sys.exit(f"{report}\n{args.output} left unchanged; profile {args.since_last} not updated")
+        GetNews.atomic_write(args.output, report)
+        print(f"Report saved to: {args.output}")
+        print(stats)
+        if failed and args.since_last:
+            sys.exit(f"Profile {args.since_last} not updated") # The next run picks up the same articles
+        if args.since_last:
+            save_profile(args.since_last, profile, articles, report)
+            print(f"Profile {args.since_last} now covers up to {datetime.fromtimestamp(max(a.get('downloaded_ts', 0) for a in articles))}")
     else:
-        root = tk.Tk()
-        try: style = ttk.Style(); style.theme_use('clam') 
-        except: pass
+        import NewsDeskGUI
         # PASS ARGS TO GUI
-        app = NewsApp(root, default_days=args.days, default_topic=args.topic, default_search=args.search)
-        root.mainloop()
+        NewsDeskGUI.run(default_days=args.days, default_topic=args.topic, default_search=args.search, auto_fetch=feeds_need_update(),
+                        default_sort=args.sort)
+
+if __name__ == "__main__":
+    # Run from the importable module so NewsDeskGUI sees the same state (e.g. DAEMON) as main()
+    import NewsDesk
+    NewsDesk.main()
@@ -0,0 +1,565 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, scrolledtext, filedialog
+import json
+import os
+import re
+import queue
+import threading
+import webbrowser
+from concurrent.futures import CancelledError
+from datetime import datetime
+
+import GetNews
+import Dedup
+import NewsDesk
+import TopicIndex
+from NewsDesk import FEEDS_FILE, filter_entries, run_ai_analysis, topic_counts
+
+# Tkinter front end for NewsDesk.py, imported only when the GUI is actually opened so
+# headless runs never load tkinter.
+
+# ==============================================================================
+# BACKGROUND TASKS
+# ==============================================================================
+
+class BackgroundTask:
+    # Runs work(task) on a worker thread. Tk isn't thread safe, so the worker only
+    # queues messages; _poll() drains them on the Tk thread via root.after.
+    POLL_MS = 50
+
+    def __init__(self, root, work, on_progress=None, on_done=None, on_error=None):
+        self.root = root
+        self.work = work
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancel_event = threading.Event()
+        self.messages = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        self.root.after(self.POLL_MS, self._poll)
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def report(self, *args):
+        # Called from the worker thread
+        self.messages.put(("progress", args))
+
+    def _run(self):
+        try:
+            result = self.work(self)
+            self.messages.put(("done", result))
+        except BaseException as e:
+            self.messages.put(("error", e))
+
+    def _poll(self):
+        while True:
+            try: kind, payload = self.messages.get_nowait()
+            except queue.Empty: break
+            if kind == "progress":
+                if self.on_progress: self.on_progress(*payload)
+            elif kind == "done":
+                if self.on_done: self.on_done(payload)
+                return
+            else:
+                if self.on_error: self.on_error(payload)
+                return
+        self.root.after(self.POLL_MS, self._poll)
+
+# ==============================================================================
+# GUI CLASSES
+# ==============================================================================
+
+class FeedManagerDialog(tk.Toplevel):
+    def __init__(self, parent, callback_refresh):
+        super().__init__(parent)
+        self.title("Manage Feeds")
+        self.geometry("500x450")
+        self.callback_refresh = callback_refresh
+        self.feeds = []
+        
+        self.listbox = tk.Listbox(self, height=10)
+        self.listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        frame = ttk.Frame(self)
+        frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Label(frame, text="Name:").grid(row=0, column=0, sticky="w")
+        self.entry_name = ttk.Entry(frame)
+        self.entry_name.grid(row=0, column=1, sticky="ew", padx=5)
+        ttk.Label(frame, text="URL:").grid(row=1, column=0, sticky="w")
+        self.entry_url = ttk.Entry(frame)
+        self.entry_url.grid(row=1, column=1, sticky="ew", padx=5)
+        ttk.Label(frame, text="Topics (csv):").grid(row=2, column=0, sticky="w")
+        self.entry_topics = ttk.Entry(frame)
+        self.entry_topics.grid(row=2, column=1, sticky="ew", padx=5)
+        frame.columnconfigure(1, weight=1)
+
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill=tk.X, padx=10, pady=10)
+        ttk.Button(btn_frame, text="Add", command=self.add_feed).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Delete", command=self.delete_feed).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Close", command=self.destroy).pack(side=tk.RIGHT, padx=5)
+        self.load_feeds()
+
+    def load_feeds(self):
+        self.listbox.delete(0, tk.END)
+        if os.path.exists(FEEDS_FILE):
+            with open(FEEDS_FILE, 'r') as f:
+                self.feeds = json.load(f)
+                for feed in self.feeds:
+                    self.listbox.insert(tk.END, f"{feed['name']} - {', '.join(feed['topics'])}")
+
+    def add_feed(self):
+        name = self.entry_name.get()
+        url = self.entry_url.get()
+        topics = [t.strip() for t in self.entry_topics.get().split(",") if t.strip()]
+        if name and url:
+            new_feed = {"name": name, "url": url, "topics": topics, "date_added": datetime.now().strftime("%Y-%m-%d")}
+            self.feeds.append(new_feed)
+            self.save_feeds()
+            self.load_feeds()
+            self.callback_refresh() 
+            self.entry_name.delete(0, tk.END); self.entry_url.delete(0, tk.END); self.entry_topics.delete(0, tk.END)
+
+    def delete_feed(self):
+        sel = self.listbox.curselection()
+        if sel:
+            del self.feeds[sel[0]]
+            self.save_feeds()
+            self.load_feeds()
+            self.callback_refresh()
+
+    def save_feeds(self):
+        with open(FEEDS_FILE, 'w') as f: json.dump(self.feeds, f, indent=4)
+        TopicIndex.update(self.feeds, FEEDS_FILE) # Filters see the change without re-reading the file
+
+class ArticleList(ttk.Frame):
+    # Virtualized article list: only enough cards to fill the viewport exist, and they are
+    # re-pointed at different rows as you scroll. Selection lives in `self.selected` (guids),
+    # not in widgets, so it survives scrolling and costs nothing per row.
+    CARD_WIDTH = 1050  # Fixed card width
+    CARD_HEIGHT = 100
+    ROW_HEIGHT = 110   # Card plus vertical padding
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.rows = []
+        self.selected = set()
+        self.cards = []
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical")
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.canvas = tk.Canvas(self, bg="#f0f0f0", yscrollcommand=self._on_view_changed)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.config(command=self.canvas.yview)
+        self.empty_label = self.canvas.create_text(20, 20, text="", anchor="nw", font=("Arial", 12), fill="#555")
+        self.canvas.bind("<Configure>", lambda e: self._ensure_pool())
+        self._bind_mousewheel(self.canvas, passthrough=True)
+
+    def _bind_mousewheel(self, widget, passthrough=False):
+        # "break" stops a card's scroll event from also reaching the canvas, which would scroll twice
+        result = None if passthrough else "break"
+        def scroll_wheel(e):
+            # SCROLL SPEED TUNING: Adjust the multipliers below (currently 30 and 10)
+            if abs(e.delta) < 5:  # Linux/some systems use small deltas
+                delta = -e.delta * 30
+            else:  # Windows/Mac use larger deltas
+                delta = int(-1*(e.delta/120)) * 10
+            self.canvas.yview_scroll(delta, "units")
+            return result
+        def scroll_up(e):
+            self.canvas.yview_scroll(-30, "units")  # SCROLL SPEED TUNING: Adjust this value
+            return result
+        def scroll_down(e):
+            self.canvas.yview_scroll(30, "units")  # SCROLL SPEED TUNING: Adjust this value
+            return result
+        
+        widget.bind("<MouseWheel>", scroll_wheel)
+        widget.bind("<Button-4>", scroll_up)
+        widget.bind("<Button-5>", scroll_down)
+        for child in widget.winfo_children():
+            self._bind_mousewheel(child, passthrough)
+
+    def _make_card(self):
+        width_px = self.CARD_WIDTH
+        card = tk.Frame(self.canvas, bg="white", bd=1, relief="solid", width=width_px, height=self.CARD_HEIGHT)
+        card.pack_propagate(False)
+        card.row = None
+        
+        # Header
+        header = tk.Frame(card, bg="#e0e0e0", height=30)
+        header.pack(fill=tk.X)
+        
+        card.var = tk.BooleanVar()
+        chk = tk.Checkbutton(header, variable=card.var, bg="#e0e0e0", activebackground="#e0e0e0",
+                             command=lambda c=card: self._on_check(c))
+        chk.pack(side=tk.LEFT, padx=5)
+        
+        card.lbl_head = tk.Label(header, bg="#e0e0e0", fg="black", font=("Arial", 10, "bold"), wraplength=width_px-60, anchor="w", justify="left")
+        card.lbl_head.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        # Body
+        body = tk.Frame(card, bg="white")
+        body.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        card.lbl_desc = tk.Label(body, bg="white", fg="#333333", justify="left", wraplength=width_px-40, anchor="nw")
+        card.lbl_desc.pack(anchor="nw", fill=tk.BOTH, expand=True)
+        
+        lbl_link = tk.Label(body, text="Read Full Article", fg="blue", bg="white", cursor="hand2", font=("Arial", 9, "underline"))
+        lbl_link.pack(anchor="w", pady=(5,0))
+        lbl_link.bind("<Button-1>", lambda e, c=card: self._open_link(c))
+
+        # Bind scrollwheel to pass through to canvas
+        self._bind_mousewheel(card)
+        card.item = self.canvas.create_window(5, -self.ROW_HEIGHT, window=card, anchor="nw", state="hidden")
+        return card
+
+    def _ensure_pool(self):
+        # One card per visible row, plus one for the partially visible row at each edge
+        needed = max(1, self.canvas.winfo_height()) // self.ROW_HEIGHT + 2
+        while len(self.cards) < needed:
+            self.cards.append(self._make_card())
+        self._refresh()
+
+    def _on_view_changed(self, first, last):
+        self.scrollbar.set(first, last)
+        self._refresh()
+
+    def _refresh(self):
+        if not self.cards: return
+        top = int(self.canvas.canvasy(0))
+        first = max(0, top // self.ROW_HEIGHT)
+        for i, card in enumerate(self.cards):
+            idx = first + i
+            if idx >= len(self.rows):
+                card.row = None
+                self.canvas.itemconfigure(card.item, state="hidden")
+                continue
+            data = self.rows[idx]
+            if card.row is not data:
+                card.row = data
+                card.lbl_head.config(text=f"[{data.get('source_name', 'Unknown')}] {data.get('title', 'No Title')}")
+                card.lbl_desc.config(text=data.get('description', '')[:300]+"...")
+            card.var.set(data.get('guid') in self.selected)
+            self.canvas.coords(card.item, 5, idx * self.ROW_HEIGHT + 5)
+            self.canvas.itemconfigure(card.item, state="normal")
+
+    def _on_check(self, card):
+        if card.row is None: return
+        guid = card.row.get('guid')
+        if card.var.get(): self.selected.add(guid)
+        else: self.selected.discard(guid)
+
+    def _open_link(self, card):
+        if card.row is not None: webbrowser.open_new(card.row.get('link', ''))
+
+    def set_rows(self, rows):
+        self.rows = rows
+        self.selected = set()
+        self.canvas.itemconfigure(self.empty_label, text="" if rows else "No articles found.")
+        self.canvas.configure(scrollregion=(0, 0, self.CARD_WIDTH + 10, max(1, len(rows) * self.ROW_HEIGHT)))
+        self.canvas.yview_moveto(0)
+        self._ensure_pool()
+
+    def set_all(self, state):
+        self.selected = set(data.get('guid') for data in self.rows) if state else set()
+        self._refresh()
+
+    def invert(self):
+        self.selected = set(data.get('guid') for data in self.rows) - self.selected
+        self._refresh()
+
+    def selected_rows(self):
+        return [data for data in self.rows if data.get('guid') in self.selected]
+
+class NewsApp:
+    def __init__(self, root, default_days=1, default_topic="All", default_search="", auto_fetch=False, default_sort="downloaded"):
+        self.root = root
+        self.root.title("Python News Desk v3.2")
+        self.root.geometry("1100x850")
+        self.task = None # The one BackgroundTask (fetch or briefing) currently running
+        
+        self.init_days = default_days
+        self.init_topic = default_topic
+        self.init_search = default_search
+        self.init_sort = default_sort
+        
+        self._setup_ui()
+        
+        if self.init_search: self.entry_search.insert(0, self.init_search)
+        self.spin_days.set(self.init_days)
+        self.combo_sort.set(self.init_sort.capitalize())
+        self.combo_topic.set(self.init_topic or TopicIndex.ALL)
+        self._load_config()
+        
+        # We need to wait a ms for the window to draw so we can get the width for the cards
+        self.root.after(100, self.apply_filters)
+        if auto_fetch: self.root.after(200, self.fetch_news)
+
+    def _setup_ui(self):
+        toolbar = ttk.Frame(self.root, padding=5)
+        toolbar.pack(fill=tk.X)
+        self.btn_fetch = ttk.Button(toolbar, text="🔄 Fetch New Articles", command=self.fetch_news)
+        self.btn_fetch.pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="⚙️ Manage Feeds", command=self.open_manager).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="❓ Help", command=self.show_help).pack(side=tk.LEFT, padx=5)
+        
+        filter_bar = ttk.LabelFrame(self.root, text="Filters & Search", padding=5)
+        filter_bar.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Label(filter_bar, text="Age (Days):").pack(side=tk.LEFT, padx=5)
+        self.spin_days = ttk.Spinbox(filter_bar, from_=1, to=365, width=5, command=self.apply_filters)
+        self.spin_days.pack(side=tk.LEFT, padx=5)
+
+        # Age and order by when we downloaded an article, or when its feed says it was published
+        ttk.Label(filter_bar, text="By:").pack(side=tk.LEFT, padx=5)
+        self.combo_sort = ttk.Combobox(filter_bar, state="readonly", width=11, values=["Downloaded", "Published"])
+        self.combo_sort.pack(side=tk.LEFT, padx=5)
+        self.combo_sort.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
+        
+        ttk.Label(filter_bar, text="Topic:").pack(side=tk.LEFT, padx=5)
+        # Pick a topic, or type an expression such as "Tech OR Science -Sports" and press Enter
+        self.combo_topic = ttk.Combobox(filter_bar, width=22)
+        self.combo_topic.pack(side=tk.LEFT, padx=5)
+        self.combo_topic.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
+        self.combo_topic.bind("<Return>", lambda e: self.apply_filters())
+        
+        ttk.Label(filter_bar, text="Search:").pack(side=tk.LEFT, padx=(15, 5))
+        self.entry_search = ttk.Entry(filter_bar, width=30)
+        self.entry_search.pack(side=tk.LEFT, padx=5)
+        self.entry_search.bind("<Return>", lambda e: self.apply_filters())
+
+        self.include_archive = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filter_bar, text="Include archive", variable=self.include_archive, command=self.apply_filters).pack(side=tk.LEFT, padx=10)
+        self.merge_duplicates = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filter_bar, text="Merge duplicates", variable=self.merge_duplicates, command=self.apply_filters).pack(side=tk.LEFT)
+        self.full_text = tk.BooleanVar(value=False) # Briefings read the linked pages, not just the feed teaser
+        ttk.Checkbutton(filter_bar, text="Full text", variable=self.full_text).pack(side=tk.LEFT, padx=10)
+
+        # --- SCROLLABLE CONTAINER ---
+        self.article_list = ArticleList(self.root)
+        self.article_list.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        # --- STATUS BAR ---
+        status_bar = ttk.Frame(self.root, padding=(10, 0))
+        status_bar.pack(fill=tk.X, side=tk.BOTTOM)
+        self.status_label = ttk.Label(status_bar, text="Ready")
+        self.status_label.pack(side=tk.LEFT)
+        self.btn_cancel = ttk.Button(status_bar, text="Cancel", command=self.cancel_task, state=tk.DISABLED)
+        self.btn_cancel.pack(side=tk.RIGHT, padx=5)
+        self.progress = ttk.Progressbar(status_bar, length=250, mode="determinate")
+        self.progress.pack(side=tk.RIGHT, padx=5)
+
+        # --- ACTION BAR ---
+        action_bar = ttk.Frame(self.root, padding=10)
+        action_bar.pack(fill=tk.X, side=tk.BOTTOM)
+        
+        ttk.Button(action_bar, text="Select All", command=lambda: self.set_all_checks(True)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(action_bar, text="Select None", command=lambda: self.set_all_checks(False)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(action_bar, text="Invert Selection", command=self.invert_checks).pack(side=tk.LEFT, padx=5)
+        
+        self.btn_summarize = ttk.Button(action_bar, text="🤖 Generate AI Briefing (Selected)", command=self.generate_summary_gui)
+        self.btn_summarize.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=20, ipady=5)
+
+    def _load_config(self):
+        # Topic picker: "All", then every topic, each with its article count in the current window
+        try: days = int(self.spin_days.get())
+        except: days = self.init_days
+        counts = topic_counts(days, self.include_archive.get(), by=self.combo_sort.get().lower())
+        topics = [TopicIndex.ALL] + sorted(t for t in counts if t != TopicIndex.ALL)
+        self.combo_topic['values'] = [f"{t} ({counts[t]})" for t in topics]
+        topic = self.current_topic()
+        if topic in counts: self.combo_topic.set(f"{topic} ({counts[topic]})")
+
+    def current_topic(self):
+        # The picker shows "Tech (42)"; anything else is a typed topic expression
+        return re.sub(r"\s\(\d+\)$", "", self.combo_topic.get().strip())
+
+    def open_manager(self): FeedManagerDialog(self.root, self._load_config)
+
+    def show_toast(self, message, color="#333333"):
+        toast = tk.Toplevel(self.root); toast.overrideredirect(True)
+        x = self.root.winfo_x() + (self.root.winfo_width() // 2) - 100
+        y = self.root.winfo_y() + (self.root.winfo_height() // 2) - 30
+        toast.geometry(f"200x40+{x}+{y}"); toast.configure(bg=color)
+        tk.Label(toast, text=message, bg=color, fg="white", font=("Arial", 10, "bold")).pack(expand=True, fill=tk.BOTH)
+        self.root.after(1500, toast.destroy)
+
+    def _start_task(self, status, work, on_progress, on_done, on_error):
+        if self.task is not None:
+            self.show_toast("Busy, please wait", "red")
+            return None
+        def finished(callback):
+            def handler(payload):
+                self.task = None
+                self.btn_fetch.config(state=tk.NORMAL); self.btn_summarize.config(state=tk.NORMAL)
+                self.btn_cancel.config(state=tk.DISABLED)
+                self.progress.stop(); self.progress.config(mode="determinate", value=0)
+                callback(payload)
+            return handler
+        self.btn_fetch.config(state=tk.DISABLED); self.btn_summarize.config(state=tk.DISABLED)
+        self.btn_cancel.config(state=tk.NORMAL)
+        self.status_label.config(text=status)
+        self.task = BackgroundTask(self.root, work, on_progress, finished(on_done), finished(on_error)).start()
+        return self.task
+
+    def cancel_task(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.status_label.config(text="Cancelling...")
+
+    def fetch_news(self):
+        def work(task):
+            if NewsDesk.DAEMON is not None: return NewsDesk.DAEMON.fetch()
+            return GetNews.process_feeds_logic(progress=task.report, cancel=task.cancel_event)
+        def on_progress(done, total, feed_item, error):
+            self.progress.config(maximum=total, value=done)
+            state = "failed" if error is not None else "done"
+            self.status_label.config(text=f"Fetching {done}/{total}: {feed_item['name']} {state}")
+        def on_done(summary):
+            self.apply_filters()
+            if summary["cancelled"]:
+                self.status_label.config(text=f"Fetch cancelled, {summary['added']} new articles saved")
+            else:
+                self.status_label.config(text=f"{summary['added']} new articles, {summary['errors']} feeds failed")
+                self.show_toast("Feeds Updated")
+        def on_error(e):
+            self.status_label.config(text="Fetch failed")
+            messagebox.showerror("Fetch Error", str(e))
+        self._start_task("Fetching feeds...", work, on_progress, on_done, on_error)
+
+    def set_all_checks(self, state):
+        self.article_list.set_all(state)
+
+    def invert_checks(self):
+        self.article_list.invert()
+
+    def apply_filters(self):
+        try: days = int(self.spin_days.get())
+        except: days = 1
+        
+        self._load_config() # Counts follow the window
+        filtered_data = filter_entries(days, self.current_topic(), self.entry_search.get().strip(), self.include_archive.get(),
+                                       by=self.combo_sort.get().lower())
+        if self.merge_duplicates.get():
+            # One card per story; the header lists every outlet that ran it
+            filtered_data = Dedup.collapse(filtered_data)
+        self.article_list.set_rows(filtered_data)
+
+    def show_help(self):
+        manual = """# Python News Desk Manual\n\n## Auto-Update\nThe app automatically updates feeds if data is > 2 hours old on startup.\n\n## CLI Automation\nYou can generate reports without the GUI:\n`python FeedViewer.py --topic="Tech" --days=1 --output=report.md`"""
+        SummaryWindow(self.root, manual)
+
+    def generate_summary_gui(self):
+        # A merged card stands for all of its articles
+        selected_entries = [m for row in self.article_list.selected_rows() for m in row.get('members', [row])]
+        dedup = self.merge_duplicates.get()
+        enrich = self.full_text.get()
+
+        if not selected_entries:
+            self.show_toast("No articles selected", "red")
+            return
+
+        topic = self.current_topic(); search = self.entry_search.get().strip()
+        window = SummaryWindow(self.root, "", streaming=True)
+        def work(task):
+            return run_ai_analysis(selected_entries, topic, search, on_text=task.report, cancel=task.cancel_event, dedup=dedup,
+                                   enrich=enrich)
+        def on_progress(text):
+            if window.winfo_exists(): window.append_stream(text)
+        def on_done(report):
+            self.status_label.config(text="Briefing ready")
+            if window.winfo_exists(): window.set_markdown(report)
+        def on_error(e):
+            if isinstance(e, CancelledError):
+                self.status_label.config(text="Briefing cancelled")
+                if window.winfo_exists(): window.destroy()
+                return
+            self.status_label.config(text="Briefing failed")
+            if window.winfo_exists(): window.destroy()
+            messagebox.showerror("AI Error", str(e))
+        if self._start_task(f"Generating briefing from {len(selected_entries)} articles...", work, on_progress, on_done, on_error):
+            self.progress.config(mode="indeterminate"); self.progress.start(15)
+            window.protocol("WM_DELETE_WINDOW", lambda: (self.cancel_task(), window.destroy()))
+        else:
+            window.destroy()
+
+class SummaryWindow(tk.Toplevel):
+    def __init__(self, parent, markdown_text, title="AI Briefing", streaming=False):
+        super().__init__(parent); self.title(title); self.geometry("800x700")
+        self.markdown_text = markdown_text
+        
+        toolbar = ttk.Frame(self); toolbar.pack(fill=tk.X, pady=5)
+        ttk.Button(toolbar, text="Copy", command=self.copy_text).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Save", command=self.save_text).pack(side=tk.LEFT, padx=5)
+        
+        self.text_area = scrolledtext.ScrolledText(self, font=("Segoe UI", 11), wrap=tk.WORD, padx=20, pady=20)
+        self.text_area.pack(fill=tk.BOTH, expand=True)
+        self._config_tags()
+        if streaming:
+            self.title(title + " (generating...)")
+        else:
+            self.render_markdown(markdown_text)
+        self.text_area.config(state=tk.DISABLED)
+
+    def append_stream(self, text):
+        # Raw text while the model is still writing; set_markdown() re-renders it properly at the end
+        self.text_area.config(state=tk.NORMAL)
+        self.text_area.insert(tk.END, text)
+        self.text_area.see(tk.END)
+        self.text_area.config(state=tk.DISABLED)
+
+    def set_markdown(self, markdown_text):
+        self.markdown_text = markdown_text
+        self.title(self.title().replace(" (generating...)", ""))
+        self.text_area.config(state=tk.NORMAL)
+        self.text_area.delete("1.0", tk.END)
+        self.render_markdown(markdown_text)
+        self.text_area.config(state=tk.DISABLED)
+
+    def _config_tags(self):
+        self.text_area.tag_config("h1", font=("Segoe UI", 18, "bold"), foreground="#2c3e50", spacing3=10)
+        self.text_area.tag_config("h2", font=("Segoe UI", 14, "bold"), foreground="#2980b9", spacing3=5)
+        self.text_area.tag_config("bold", font=("Segoe UI", 11, "bold"))
+        self.text_area.tag_config("bullet", lmargin1=20, lmargin2=30)
+
+    def render_markdown(self, text):
+        lines = text.split('\n')
+        for line in lines:
+            tag = None; clean = line
+            if line.startswith('## '): tag="h2"; clean=line[3:]
+            elif line.startswith('# '): tag="h1"; clean=line[2:]
+            elif line.startswith('* ') or line.startswith('- '): tag="bullet"
+            idx = self.text_area.index(tk.INSERT)
+            self.text_area.insert(tk.END, clean + "\n")
+            if tag: self.text_area.tag_add(tag, idx, f"{idx} lineend")
+            for m in re.finditer(r'\*\*(.*?)\*\*', clean):
+                s = self.text_area.search(m.group(1), idx, stopindex=f"{idx} lineend")
+                if s: self.text_area.tag_add("bold", s, f"{s}+{len(m.group(1))}c")
+
+    def copy_text(self):
+        self.clipboard_clear(); self.clipboard_append(self.markdown_text)
+
+    def save_text(self):
+        f = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text", "*.txt")])
+        if f: 
+            with open(f, 'w', encoding='utf-8') as file: file.write(self.markdown_text)
+
+def run(default_days=1, default_topic="All", default_search="", auto_fetch=False, default_sort="downloaded"):
+    root = tk.Tk()
+    try: style = ttk.Style(); style.theme_use('clam') 
+    except: pass
+    # The GUI fetches stale feeds in the background instead of blocking startup
+    NewsApp(root, default_days=default_days, default_topic=default_topic, default_search=default_search, auto_fetch=auto_fetch,
+            default_sort=default_sort)
+    root.mainloop()
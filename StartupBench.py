@@ -0,0 +1,78 @@
+import os
+import re
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+# Startup-time guard for headless runs. Imports NewsDesk in fresh interpreters with
+# `-X importtime`, reports the slowest imports, and fails (exit 1) when the import takes
+# longer than the budget or pulls in a module the headless path must not load.
+#
+#   python StartupBench.py                  # 7 runs, default budget
+#   python StartupBench.py --budget-ms 80 --top 20
+#
+# Run it after adding an import to NewsDesk.py / GetNews.py / LLMBackends.py. Anything only
+# the GUI, the fetcher or one backend needs belongs inside the function that uses it.
+
+BUDGET_MS = 75      # Cumulative import time of NewsDesk, best of the runs (about 45 ms on a quiet machine)
+RUNS = 7
+# Loaded only by the GUI, a feed fetch, or the Gemini backend
+FORBIDDEN = ("tkinter", "NewsDeskGUI", "feedparser", "google.generativeai", "urllib.request")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+_LINE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+# Children may write __pycache__, so the runs time loading bytecode rather than compiling source
+CHILD_ENV = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+
+def import_profile(module="NewsDesk"):
+    # Returns ({module: cumulative microseconds}, total microseconds) for one fresh interpreter
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=HERE, capture_output=True, text=True, env=CHILD_ENV)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m: times[m.group(4)] = int(m.group(2))
+    return times, times.get(module, 0)
+
+def process_time(args, runs):
+    # Median wall time of `python NewsDesk.py <args>`, interpreter start-up included
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "NewsDesk.py"] + args, cwd=HERE, capture_output=True, env=CHILD_ENV)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="NewsDesk headless startup benchmark")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--top", type=int, default=12, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    import_profile() # Warm-up: compiles any stale bytecode
+    profiles = [import_profile() for _ in range(args.runs)]
+    best, total = min(profiles, key=lambda p: p[1]) # Least disturbed by other work on the machine
+    totals = [p[1] / 1000 for p in profiles]
+    print(f"import NewsDesk: best {min(totals):.1f} ms, median {statistics.median(totals):.1f} ms over {args.runs} runs")
+    print(f"python NewsDesk.py --help: {process_time(['--help'], args.runs) * 1000:.0f} ms (median, whole process)")
+
+    print("\nSlowest imports (cumulative ms):")
+    for name, us in sorted(best.items(), key=lambda kv: -kv[1])[1:args.top + 1]:
+        print(f"  {us / 1000:7.1f}  {name}")
+
+    failures = []
+    loaded = [name for name in FORBIDDEN if any(m == name or m.startswith(name + ".") for m in best)]
+    if loaded: failures.append(f"headless import loads {', '.join(loaded)}")
+    if total / 1000 > args.budget_ms: failures.append(f"import took {total / 1000:.1f} ms, budget is {args.budget_ms:.0f} ms")
+    for failure in failures: print(f"FAIL: {failure}")
+    if not failures: print(f"\nOK: within {args.budget_ms:.0f} ms, no GUI/fetcher/SDK imports")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import os
+import re
+import json
+import threading
+
+# Which sources carry which topics, built once from feeds.json and kept until the file
+# changes (or FeedManagerDialog hands over the new feed list with update()).
+#
+#   index = TopicIndex.load()
+#   index.sources("Tech")                           # frozenset of source names
+#   index.sources('Tech OR Science -Sports')        # a topic expression
+#   index.counts(store.count_by_source(...))        # {topic: articles} for the topic picker
+#
+# Topic expressions read like searches: topics next to each other are ANDed, with OR,
+# NOT / -topic, ( ) and "quoted names" for topics containing spaces. Any topic name on its
+# own, spaces and all, is just that topic. Matching is case-insensitive. "All" or nothing
+# means no topic filter.
+
+FEEDS_FILE = "feeds.json"
+ALL = "All"
+
+_TOKEN = re.compile(r'"[^"]*"|\(|\)|[^\s()"]+')
+
+class TopicIndex:
+    def __init__(self, feeds):
+        topic_sources = {}
+        self.source_topics = {}
+        for feed in feeds:
+            topics = feed.get('topics', [])
+            self.source_topics[feed['name']] = tuple(topics)
+            for topic in topics:
+                topic_sources.setdefault(topic, set()).add(feed['name'])
+        self.topic_sources = {topic: frozenset(names) for topic, names in topic_sources.items()}
+        self.topics = sorted(self.topic_sources)
+        self.all_sources = frozenset(self.source_topics)
+        self._lower = {topic.lower(): topic for topic in self.topics}
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    def sources(self, expr):
+        # frozenset of source names matching a topic expression, or None for no topic filter
+        expr = (expr or "").strip()
+        if not expr or expr == ALL: return None
+        with self._cache_lock:
+            if expr in self._cache: return self._cache[expr]
+        found = self._lookup(expr)
+        if found is None: found = self._evaluate(_TOKEN.findall(expr))
+        with self._cache_lock:
+            self._cache[expr] = found
+        return found
+
+    def counts(self, source_counts):
+        # {topic: articles} given {source_name: articles}; "All" counts every source
+        counts = {topic: sum(source_counts.get(name, 0) for name in names) for topic, names in self.topic_sources.items()}
+        counts[ALL] = sum(source_counts.values())
+        return counts
+
+    def _lookup(self, name):
+        topic = self._lower.get(name.lower())
+        return None if topic is None else self.topic_sources[topic]
+
+    def _evaluate(self, tokens):
+        # Recursive descent over the tokens: OR binds loosest, then AND (explicit or implied),
+        # then NOT / -. Stray operators and parentheses are ignored rather than rejected.
+        pos = 0
+
+        def peek():
+            return tokens[pos] if pos < len(tokens) else None
+
+        def factor():
+            nonlocal pos
+            tok = peek()
+            if tok is None or tok in ("OR", ")"): return None
+            pos += 1
+            if tok == "NOT":
+                inner = factor()
+                return None if inner is None else self.all_sources - inner
+            if tok == "(":
+                inner = either()
+                if peek() == ")": pos += 1
+                return inner
+            if tok == "AND": return factor()
+            if tok.startswith('"'): return self._lookup(tok.strip('"')) or frozenset()
+            if tok.startswith("-") and len(tok) > 1: return self.all_sources - (self._lookup(tok[1:]) or frozenset())
+            return self._lookup(tok) or frozenset()
+
+        def both():
+            result = None
+            while peek() not in (None, "OR", ")"):
+                found = factor()
+                if found is not None: result = found if result is None else result & found
+            return result
+
+        def either():
+            nonlocal pos
+            result = both()
+            while peek() == "OR":
+                pos += 1
+                found = both()
+                if found is not None: result = found if result is None else result | found
+            return result
+
+        result = either()
+        while pos < len(tokens): # Whatever follows a stray ")" is ANDed on
+            pos += 1
+            found = either()
+            if found is not None: result = found if result is None else result & found
+        return frozenset() if result is None else result
+
+# ------------------------------------------------------------------------------
+# Process-wide index, rebuilt only when feeds.json changes
+# ------------------------------------------------------------------------------
+
+_current = None # (path, signature, index)
+_lock = threading.Lock()
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def load(path=FEEDS_FILE):
+    global _current
+    sig = _signature(path)
+    with _lock:
+        if _current is not None and _current[:2] == (path, sig): return _current[2]
+    feeds = []
+    if sig is not None:
+        with open(path, 'r') as f: feeds = json.load(f)
+    index = TopicIndex(feeds)
+    with _lock:
+        _current = (path, sig, index)
+    return index
+
+def update(feeds, path=FEEDS_FILE):
+    # Call right after writing `feeds` to `path`: swaps in the new index without reading it back
+    global _current
+    index = TopicIndex(feeds)
+    with _lock:
+        _current = (path, _signature(path), index)
+    return index
@@ -0,0 +1,103 @@
+import os
+import sys
+import json
+import time
+import unittest
+import contextlib
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import GetNews
+import Benchmark
+
+# Feed fetching against Benchmark's local feed server, in a throwaway folder
+# (Benchmark.workspace), so your feeds.json and newsdesk.db are never touched.
+#
+#   python -m pytest tests        (or: python -m unittest discover tests)
+
+FEEDS = 6
+ITEMS = 5
+
+class FetchTestCase(unittest.TestCase):
+    def setUp(self):
+        stack = contextlib.ExitStack()
+        self.addCleanup(stack.close)
+        self.server, url = Benchmark.start_feed_server(ITEMS)
+        stack.callback(self.server.server_close)
+        stack.callback(self.server.shutdown)
+        stack.enter_context(Benchmark.workspace())
+        stack.enter_context(mock.patch("sys.stdout"))
+        self.config = Benchmark.feed_config(url, FEEDS)
+        with open(GetNews.FEEDS_FILE, "w") as f: json.dump(self.config, f)
+
+class FetchAllFeedsTest(FetchTestCase):
+    def test_results_follow_feed_order(self):
+        # The first feeds answer last; results still come back in feeds.json order
+        self.server.delays = {0: 0.4, 1: 0.2}
+        finished = []
+        results = GetNews.fetch_all_feeds(self.config, progress=lambda done, total, feed, error: finished.append(feed['name']))
+        self.assertEqual([feed['name'] for feed, d, error in results], [feed['name'] for feed in self.config])
+        self.assertEqual(finished[-1], self.config[0]['name'])
+        for feed, d, error in results:
+            self.assertIsNone(error)
+            self.assertEqual(len(d.entries), ITEMS)
+
+    def test_slow_feed_times_out_without_stalling_the_rest(self):
+        self.server.delays = {0: 3.0}
+        cache = {}
+        start = time.monotonic()
+        results = GetNews.fetch_all_feeds(self.config, timeout=0.5, cache=cache)
+        self.assertLess(time.monotonic() - start, 2.0)
+        feed, d, error = results[0]
+        self.assertIsNone(d)
+        self.assertIsNotNone(error)
+        self.assertEqual(cache[feed['url']]["health"]["error_streak"], 1)
+        for feed, d, error in results[1:]:
+            self.assertIsNone(error)
+            self.assertEqual(len(d.entries), ITEMS)
+
+class ConditionalFetchTest(FetchTestCase):
+    def fetch(self):
+        return GetNews.process_feeds_logic()
+
+    def test_304_skips_the_feed(self):
+        self.assertEqual(self.fetch()["added"], FEEDS * ITEMS)
+        self.assertTrue(all(record.get("etag") for record in GetNews.load_feed_cache().values()))
+        summary = self.fetch()
+        self.assertEqual((summary["unchanged"], summary["added"]), (FEEDS, 0))
+
+    def test_same_body_skips_the_feed(self):
+        # No ETag from the server: the content hash is what notices nothing changed
+        self.server.etags = False
+        self.fetch()
+        self.assertTrue(all(record.get("content_hash") and "etag" not in record
+                            for record in GetNews.load_feed_cache().values()))
+        summary = self.fetch()
+        self.assertEqual((summary["unchanged"], summary["added"]), (FEEDS, 0))
+
+    def test_changed_feed_is_fetched_again(self):
+        self.fetch()
+        self.server.version += 1
+        summary = self.fetch()
+        self.assertEqual(summary["unchanged"], 0)
+        self.assertEqual(summary["added"], FEEDS * (ITEMS // 2))
+
+    def test_validators_wait_until_entries_are_stored(self):
+        with mock.patch.object(GetNews.get_store(), "add", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.fetch()
+        self.assertFalse(any("etag" in record or "content_hash" in record for record in GetNews.load_feed_cache().values()))
+        # Nothing was skipped as unchanged: every article arrives on the next run
+        summary = self.fetch()
+        self.assertEqual((summary["unchanged"], summary["added"]), (0, FEEDS * ITEMS))
+
+    def test_validators_wait_until_entries_are_built(self):
+        with mock.patch.object(GetNews.ArticleStore, "Article", side_effect=ValueError("bad entry")):
+            summary = self.fetch()
+        self.assertEqual((summary["errors"], summary["added"]), (FEEDS, 0))
+        self.assertFalse(any("etag" in record or "pending" in record for record in GetNews.load_feed_cache().values()))
+        summary = self.fetch()
+        self.assertEqual((summary["unchanged"], summary["added"]), (0, FEEDS * ITEMS))
+
+if __name__ == "__main__":
+    unittest.main()
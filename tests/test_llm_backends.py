@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import LLMBackends
+import MockLLMServer
+
+# OpenAICompatibleBackend against MockLLMServer: streaming, Retry-After and the retry limit.
+#
+#   python -m pytest tests        (or: python -m unittest discover tests)
+
+PROMPT = "Title: One\nTitle: Two\nSummarize these."
+
+class OpenAICompatibleBackendTest(unittest.TestCase):
+    def setUp(self):
+        self.server, url = MockLLMServer.start_mock_server()
+        self.backend = LLMBackends.OpenAICompatibleBackend("mock", url)
+        # Retries without the real backoff; a 429's Retry-After (1s) still applies
+        patches = [mock.patch.object(LLMBackends, "BACKOFF_BASE", 0.01), mock.patch.object(LLMBackends, "MAX_RETRIES", 2),
+                   mock.patch("sys.stdout")]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_plain_response(self):
+        self.assertEqual(self.backend.generate(PROMPT), MockLLMServer.mock_reply(PROMPT))
+
+    def test_streamed_response_arrives_whole(self):
+        chunks = []
+        text = self.backend.generate(PROMPT, on_text=chunks.append)
+        self.assertEqual(text, MockLLMServer.mock_reply(PROMPT))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), text)
+
+    def test_429_waits_for_retry_after(self):
+        self.server.errors.append(429)
+        start = time.monotonic()
+        self.assertEqual(self.backend.generate(PROMPT), MockLLMServer.mock_reply(PROMPT))
+        self.assertGreaterEqual(time.monotonic() - start, 1.0)
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(self.backend.stats["retries"], 1)
+
+    def test_5xx_is_retried(self):
+        self.server.errors.extend([503, 502])
+        self.assertEqual(self.backend.generate(PROMPT), MockLLMServer.mock_reply(PROMPT))
+        self.assertEqual(self.server.requests, 3)
+
+    def test_5xx_gives_up_after_the_retry_limit(self):
+        self.server.errors.extend([500] * 10)
+        with self.assertRaises(LLMBackends.BackendError) as caught:
+            self.backend.generate(PROMPT)
+        self.assertEqual(caught.exception.status, 500)
+        self.assertEqual(self.server.requests, 3) # The first try and MAX_RETRIES retries
+        self.assertEqual(self.backend.stats["errors"], 1)
+
+    def test_client_errors_are_not_retried(self):
+        self.server.errors.append(400)
+        with self.assertRaises(LLMBackends.BackendError):
+            self.backend.generate(PROMPT)
+        self.assertEqual(self.server.requests, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ArticleStore
+import TopicIndex
+
+# The two hand-written query parsers: search text -> FTS5 expression (ArticleStore.fts_query)
+# and topic expressions -> sets of sources (TopicIndex).
+#
+#   python -m pytest tests        (or: python -m unittest discover tests)
+
+class FtsQueryTest(unittest.TestCase):
+    def check(self, text, expected):
+        self.assertEqual(ArticleStore.fts_query(text), expected)
+
+    def test_words_are_anded(self):
+        self.check("rate cut", '"rate" AND "cut"')
+
+    def test_operators_phrases_and_prefixes(self):
+        self.check('"interest rate" OR infla*', '"interest rate" OR "infla"*')
+        self.check("(tech OR science) AND ai", '( "tech" OR "science" ) AND "ai"')
+
+    def test_exclusion_after_a_term(self):
+        self.check("foo -bar", '"foo" NOT "bar"')
+        self.check("foo NOT bar", '"foo" NOT "bar"')
+        self.check("foo AND -bar", '"foo" NOT "bar"')
+
+    def test_leading_exclusion_waits_for_a_term(self):
+        self.check("-foo bar", '"bar" NOT "foo"')
+        self.check("NOT foo bar", '"bar" NOT "foo"')
+        self.check("-a -b c", '"c" NOT "a" NOT "b"')
+        self.check("x OR -y z", '"x" OR "z" NOT "y"')
+        self.check("(-a b) c", '( "b" NOT "a" ) AND "c"')
+
+    def test_excluded_groups_and_phrases(self):
+        self.check("story -(foo OR bar)", '"story" NOT ( "foo" OR "bar" )')
+        self.check("NOT (foo OR bar) story", '"story" NOT ( "foo" OR "bar" )')
+        self.check('-"foo bar" story', '"story" NOT "foo bar"')
+
+    def test_only_exclusions_search_for_nothing(self):
+        self.check("-foo", "")
+        self.check("NOT foo", "")
+        self.check("NOT (foo OR bar)", "")
+
+    def test_malformed_input_is_repaired(self):
+        self.check("a (b", '"a" AND ( "b" )')
+        self.check("a)", '"a"')
+        self.check("OR a AND", '"a"')
+        self.check("( )", "")
+        self.check('say "hi', '"say" AND "hi"')
+        self.check("story - bar", '"story" AND "bar"')
+
+    def test_quotes_inside_words_are_escaped(self):
+        self.check('it"s', '"it" AND "s"')
+
+class FtsSearchTest(unittest.TestCase):
+    # The expressions against a real FTS5 index
+    def setUp(self):
+        self.store = ArticleStore.ArticleStore(":memory:")
+        if not self.store.has_fts: self.skipTest("SQLite built without FTS5")
+        self.store.add([ArticleStore.Article(guid, "", title, "", "", "2025-01-01", "S")
+                        for guid, title in (("1", "foo story"), ("2", "bar story"), ("3", "foo bar"), ("4", "plain story"))])
+
+    def tearDown(self):
+        self.store.close()
+
+    def found(self, text):
+        return sorted(a.guid for a in self.store.search(text))
+
+    def test_exclusions_exclude(self):
+        self.assertEqual(self.found("-foo bar"), ["2"])
+        self.assertEqual(self.found("NOT foo story"), ["2", "4"])
+        self.assertEqual(self.found("story -(foo OR bar)"), ["4"])
+        self.assertEqual(self.found("NOT foo"), [])
+
+    def test_odd_input_never_raises(self):
+        for text in ('"', "(((", ")", "- -", "NOT", "a OR OR b", '-"', "*", "-(", "AND (NOT) OR"):
+            self.store.search(text)
+
+class TopicExpressionTest(unittest.TestCase):
+    def setUp(self):
+        self.index = TopicIndex.TopicIndex([
+            {"name": "Wire", "topics": ["World", "Business"]},
+            {"name": "Gadgets", "topics": ["Tech"]},
+            {"name": "Lab", "topics": ["Science", "Tech"]},
+            {"name": "Stadium", "topics": ["Sports"]},
+            {"name": "Green", "topics": ["Climate Change", "Science"]},
+        ])
+
+    def check(self, expr, expected):
+        self.assertEqual(self.index.sources(expr), frozenset(expected))
+
+    def test_no_filter(self):
+        self.assertIsNone(self.index.sources(""))
+        self.assertIsNone(self.index.sources("All"))
+
+    def test_single_topic_case_insensitive(self):
+        self.check("Tech", {"Gadgets", "Lab"})
+        self.check("tech", {"Gadgets", "Lab"})
+
+    def test_topic_name_with_spaces(self):
+        self.check("Climate Change", {"Green"})
+        self.check('"Climate Change" OR Sports', {"Green", "Stadium"})
+
+    def test_or_and_not(self):
+        self.check("Tech OR Sports", {"Gadgets", "Lab", "Stadium"})
+        self.check("Tech Science", {"Lab"})
+        self.check("Tech AND Science", {"Lab"})
+        self.check("Science -Tech", {"Green"})
+        self.check("Science NOT Tech", {"Green"})
+
+    def test_precedence_and_parentheses(self):
+        # OR binds loosest: Sports OR (Tech AND Science)
+        self.check("Sports OR Tech Science", {"Stadium", "Lab"})
+        self.check("(Sports OR Tech) Science", {"Lab"})
+
+    def test_leading_not_is_everything_else(self):
+        self.check("-Tech", {"Wire", "Stadium", "Green"})
+        self.check("NOT (Tech OR Science)", {"Wire", "Stadium"})
+
+    def test_unknown_topics_and_stray_operators(self):
+        self.check("Nonexistent", set())
+        self.check("Tech OR", {"Gadgets", "Lab"})
+        self.check("Tech ) Science", {"Lab"})
+        self.check("( Tech", {"Gadgets", "Lab"})
+
+if __name__ == "__main__":
+    unittest.main()